@@ -4,112 +4,367 @@ GitHub Organization Management Tool
 """
 import os
 import sys
+import queue
+import atexit
 import argparse
+import functools
 import logging
+import logging.handlers
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Optional
 
-# Adiciona o diretório scripts ao path para permitir importações diretas
+# Adiciona o diretório scripts ao path para permitir importações diretas.
+# Os módulos de scripts/ são importados sob demanda em cada comando, para que
+# um comando não pague o custo de importação (requests, yaml, jwt...) dos demais.
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
-from scripts.repos_list import sync_organization_labels, get_github_repos, export_to_csv
-from scripts.github_app_auth import get_github_app_installation_token
-from scripts.labels_sync import sync_labels_for_repo
-from scripts.projects_panels import main as projects_panels_main
-from scripts.issues_close_date import main as issues_close_date_main
 
 DEFAULT_ORG = 'splor-mg'
 DEFAULT_LABELS_FILE = 'config/labels.yaml'
+# 'app' (GitHub App) ou 'pat' (token pessoal em GITHUB_TOKEN)
+DEFAULT_AUTH_MODE = 'app'
+
+# Diretórios de saída, criados uma única vez na carga do módulo
+CONFIG_DIR = Path('config')
+CONFIG_DIR.mkdir(exist_ok=True)
+LOGS_DIR = Path('logs')
+LOGS_DIR.mkdir(exist_ok=True)
+
+logger = logging.getLogger(__name__)
+
+# Registros de log acumulados em memória antes de gravar no arquivo
+LOG_BUFFER_CAPACITY = 256
+
+# Rotação do arquivo de log (tamanho máximo e cópias antigas mantidas)
+LOG_MAX_BYTES = 10_000_000
+LOG_BACKUP_COUNT = 3
+
+# Renovação do installation token após um 401 (o cache fica em github_app_auth)
+_TOKEN_LOCK = threading.Lock()
+# Token renovado após um 401, compartilhado pelas threads (a Config é imutável)
+_REFRESHED_TOKEN: Optional[str] = None
+
+# Snapshot do .env gravado por versões anteriores (continha segredos); removido na carga
+LEGACY_ENV_CACHE_FILE = LOGS_DIR / '.env.cache.pkl'
+
+# Conexões HTTP mantidas abertas por host (>= GH_SYNC_WORKERS)
+HTTP_POOL_SIZE = 32
+
+# Paralelismo da sincronização de labels (uma thread por repositório)
+DEFAULT_SYNC_WORKERS = 8
 
 # Configuração de logging
+# Exemplos exibidos no --help (epilog) e na ajuda estática
+_USAGE_EXAMPLES = """
+Exemplos de uso:
+  # Labels e repositórios
+  python main.py --repos-list                  # Lista repositórios
+  python main.py --sync-labels           # Sincroniza labels nos repositórios
+  python main.py --sync-org                    # Labels padrão da organização
+  python main.py --all                         # Executa todas as operações
+  python main.py --verbose                     # Modo verboso
+  python main.py --sync-labels --delete-extras  # Sincroniza e remove labels extras
+  python main.py --org minha-org --repos repo1,repo2  # Sincroniza repositórios específicos
+  python main.py --labels /caminho/labels.yaml  # Usa arquivo de labels customizado
+  
+  # Projetos GitHub
+  python main.py --projects-panels-info        # Atualiza dados completos dos projetos (projects-panels-info.yml)
+  python main.py --projects-panels-list        # Atualiza lista de projetos (projects-panels-list.yml)
+  python main.py --projects-panels-update      # Atualiza ambos: info e lista
+  python main.py --projects-output "meus_projetos.yml"  # Arquivo de saída customizado
+  python main.py --projects-panels-list-output "lista.yml"     # Arquivo de lista customizado
+  
+  # Issues e campos de data
+  python main.py --issues-close-date           # Gerencia campo Data Fim em projetos
+  python main.py --issues-close-date-panel                # Seleção interativa de projetos para issues
+  python main.py --issues-close-date-panels "1,2,3"     # Projetos específicos para issues
+  python main.py --issues-close-date-field "Data Conclusão"  # Campo customizado para issues
+  python main.py --issues-repos-file "repos.csv"  # Arquivo de repositórios customizado
+  python main.py --issues-projects-list "projetos.yml"  # Arquivo de projetos customizado
+"""
+
+_STATIC_HELP = (
+    "usage: main.py [opções]\n\n"
+    "GitHub Organization Management Tool\n"
+    + _USAGE_EXAMPLES +
+    "\nUse 'python main.py --help' para ver todas as opções."
+)
+
+
+class _EmojiFormatter(logging.Formatter):
+    """Formatter do console: prefixa cada mensagem com o emoji do seu nível"""
+    
+    EMOJIS = {
+        logging.DEBUG: '🔍',
+        logging.INFO: '🔄',
+        logging.WARNING: '⚠️ ',
+        logging.ERROR: '❌',
+        logging.CRITICAL: '🛑',
+    }
+    
+    def format(self, record: logging.LogRecord) -> str:
+        record.emoji = self.EMOJIS.get(record.levelno, '•')
+        return super().format(record)
+
+
 def setup_logging(verbose: bool = False) -> None:
-    """Configura o sistema de logging"""
+    """Configura o sistema de logging
+
+    As threads apenas enfileiram os registros (QueueHandler); um QueueListener
+    em segundo plano os escreve no console (com o emoji do nível, no estilo dos
+    demais prints) e no arquivo (com data e nível). O arquivo só é aberto no
+    primeiro registro, é rotacionado ao atingir LOG_MAX_BYTES e é gravado
+    em lotes (MemoryHandler): os registros ficam em memória e são descarregados
+    a cada LOG_BUFFER_CAPACITY registros, em qualquer ERROR ou na saída do
+    programa.
+    """
     level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('logs/github_management.log')
-        ]
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(_EmojiFormatter('%(emoji)s %(message)s'))
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOGS_DIR / 'github_management.log', maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True
+    )
+    file_handler.setLevel(level)
+    file_handler.setFormatter(formatter)
+    memory_handler = logging.handlers.MemoryHandler(
+        LOG_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=file_handler
     )
+    
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, memory_handler)
+    listener.start()
+    # atexit executa em ordem inversa: esvazia a fila antes de fechar o arquivo
+    atexit.register(memory_handler.close)
+    atexit.register(listener.stop)
+    
+    # O QueueHandler só resolve a mensagem; o formato final é dos handlers do listener
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=level, handlers=[queue_handler])
+
+@dataclass(frozen=True)
+class Config:
+    """Configuração da execução (imutável)
 
-def load_environment() -> dict:
+    Derive cópias com dataclasses.replace (ex: opções da linha de comando,
+    token validado). Sem slots=True para manter compatibilidade com Python 3.9.
+    """
+    github_org: str
+    labels_file: str
+    auth_mode: str = DEFAULT_AUTH_MODE
+    github_token: str = ''
+    delete_extras: bool = False
+    session: Any = field(default=None, repr=False, compare=False)
+
+
+def load_environment() -> Config:
     """Carrega variáveis de ambiente do arquivo .env"""
     env_file = Path('.env')
+    LEGACY_ENV_CACHE_FILE.unlink(missing_ok=True)
     
     if env_file.exists():
         print(f"📁 Carregando variáveis de {env_file}...")
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+        # Variáveis já definidas no ambiente (ex: token do shell) têm precedência
+        from scripts.env_file import parse_env
+        for key, value in parse_env(env_file.read_text(encoding='utf-8')).items():
+            os.environ.setdefault(key, value)
         print("✅ Variáveis de ambiente carregadas")
     else:
         print(f"⚠️  Arquivo {env_file} não encontrado")
     
-    # Retorna configurações (sem exigir PAT)
-    return {
-        'github_org': os.getenv('GITHUB_ORG', DEFAULT_ORG),
-        'labels_file': os.getenv('GITHUB_LABELS_FILE', DEFAULT_LABELS_FILE)
-    }
+    # Retorna configurações (GitHub App por padrão; PAT com GITHUB_AUTH_MODE=pat)
+    return Config(
+        github_org=os.getenv('GITHUB_ORG', DEFAULT_ORG),
+        labels_file=os.getenv('GITHUB_LABELS_FILE', DEFAULT_LABELS_FILE),
+        auth_mode=os.getenv('GITHUB_AUTH_MODE', DEFAULT_AUTH_MODE).lower(),
+        delete_extras=os.getenv('GITHUB_DELETE_EXTRAS', '').lower() in ('1', 'true', 'yes'),
+    )
+
+def _invalidate_cached_token() -> None:
+    """Remove o token em cache (ex: após um 401)"""
+    from scripts.github_app_auth import invalidate_cached_token
+    invalidate_cached_token()
+
+def _cached_token() -> str:
+    """Retorna o installation token em cache ou gera um novo
+
+    O cache (em memória e em logs/.gh_app_token.json) fica em
+    scripts.github_app_auth e é compartilhado com os scripts chamados.
+    """
+    from scripts.github_app_auth import get_github_app_installation_token
+    return get_github_app_installation_token()
+
+def _current_token(config: Config) -> str:
+    """Token vigente: o renovado após um 401 ou o validado na configuração"""
+    return _REFRESHED_TOKEN or config.github_token
+
+def _refresh_token(stale_token: Optional[str] = None) -> str:
+    """Descarta o token em cache e gera um novo (usado após um 401)
+
+    Seguro entre threads: se outra thread já renovou o token recusado
+    (stale_token), reaproveita o novo em vez de gerar outro.
+    """
+    global _REFRESHED_TOKEN
+    with _TOKEN_LOCK:
+        if stale_token and _REFRESHED_TOKEN and _REFRESHED_TOKEN != stale_token:
+            return _REFRESHED_TOKEN
+        _invalidate_cached_token()
+        _REFRESHED_TOKEN = _cached_token()
+        return _REFRESHED_TOKEN
+
+def _is_unauthorized(exc: Exception) -> bool:
+    """Verifica se a exceção corresponde a uma resposta HTTP 401"""
+    response = getattr(exc, 'response', None)
+    return getattr(response, 'status_code', None) == 401
+
+def _make_session():
+    """Cria a sessão HTTP compartilhada pelos comandos
+
+    Mantém as conexões com api.github.com abertas (keep-alive) e repete
+    requisições idempotentes que falham com 429/502/503/504, respeitando o
+    cabeçalho Retry-After enviado pelo GitHub. Um GHRateLimiter acompanha
+    X-RateLimit-Remaining e espaça as chamadas quando a cota fica baixa. A
+    autenticação continua sendo enviada por requisição, pois o token pode ser
+    renovado durante a execução.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    from scripts.rate_limiter import GHRateLimiter
+
+    session = requests.Session()
+    session.headers['Accept'] = 'application/vnd.github+json'
+    retry = Retry(total=5, backoff_factor=1, status_forcelist=[429, 502, 503, 504],
+                  respect_retry_after_header=True, raise_on_status=False)
+    session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=HTTP_POOL_SIZE,
+                                          max_retries=retry))
+    GHRateLimiter().attach(session)
+    atexit.register(session.close)
+    return session
+
 
-def validate_config(config: dict) -> bool:
-    """Valida se a configuração está correta"""
-    # Validar variáveis do GitHub App gerando um token de instalação
+def _sync_repo_labels(repo_name: str, labels: list, config: Config, delete_extras: bool,
+                      current_labels: Optional[list] = None, out=print) -> tuple:
+    """Sincroniza as labels de um repositório (executado nas threads do pool)
+
+    Renova o token e tenta uma única vez se a API responder 401. Retorna
+    sempre a 4-tupla (success, deleted, errors, details). As linhas de saída
+    vão para `out` (ver sync_labels_for_repo).
+    """
+    from scripts.labels_sync import sync_labels_for_repo
+    token = _current_token(config)
     try:
-        token = get_github_app_installation_token()
-        print(f"🔑 Token de instalação obtido: {token[:8]}...")
-        config['github_token'] = token
+        result = sync_labels_for_repo(repo_name, labels, token, config.github_org,
+                                      delete_extras=delete_extras, session=config.session,
+                                      current_labels=current_labels, out=out)
     except Exception as e:
-        print(f"❌ Falha ao gerar token do GitHub App: {e}")
-        print("💡 Defina GITHUB_APP_ID, GITHUB_APP_INSTALLATION_ID e GITHUB_APP_PRIVATE_KEY(_PATH)")
-        return False
+        # Com PAT não há como renovar o token: o 401 é repassado ao chamador
+        if not _is_unauthorized(e) or config.auth_mode == 'pat':
+            raise
+        # Token em cache revogado/expirado: renova e tenta uma vez
+        out("🔑 Token recusado (401), gerando um novo token de instalação...")
+        result = sync_labels_for_repo(repo_name, labels, _refresh_token(token),
+                                      config.github_org, delete_extras=delete_extras,
+                                      session=config.session,
+                                      current_labels=current_labels, out=out)
+
+    # Unpack results (retrocompat: 3 or 4-tuple)
+    if isinstance(result, tuple) and len(result) == 4:
+        return result
+    success_repo, deleted_repo, errors_repo = result
+    details = {
+        'processed': success_repo + errors_repo,
+        'created': 0,
+        'updated_name': 0,
+        'adjusted_color': 0,
+        'adjusted_description': 0,
+        'deleted': deleted_repo,
+        'unchanged': 0,
+        'errors': errors_repo,
+    }
+    return success_repo, deleted_repo, errors_repo, details
+
+class ConfigError(Exception):
+    """Configuração inválida ou incompleta; a mensagem já traz a dica de correção"""
+
+
+def ensure_config(config: Config) -> Config:
+    """Valida a configuração e retorna uma cópia com o token
+
+    Levanta ConfigError se a configuração estiver incorreta.
+    """
+    auth_mode = config.auth_mode
+    if auth_mode == 'pat':
+        token = os.getenv('GITHUB_TOKEN')
+        if not token:
+            raise ConfigError(
+                "❌ GITHUB_AUTH_MODE=pat exige a variável GITHUB_TOKEN\n"
+                "💡 Defina GITHUB_TOKEN com um token pessoal com acesso à organização"
+            )
+        print(f"🔑 Token pessoal (PAT): {token[:8]}...")
+    elif auth_mode == 'app':
+        # Validar variáveis do GitHub App gerando (ou reaproveitando) um token de instalação
+        try:
+            token = _cached_token()
+        except Exception as e:
+            raise ConfigError(
+                f"❌ Falha ao gerar token do GitHub App: {e}\n"
+                "💡 Defina GITHUB_APP_ID, GITHUB_APP_INSTALLATION_ID e GITHUB_APP_PRIVATE_KEY(_PATH)"
+            ) from e
+        print(f"🔑 Token de instalação obtido: {token[:8]}...")
+    else:
+        raise ConfigError(
+            f"❌ GITHUB_AUTH_MODE inválido: {auth_mode}\n"
+            "💡 Use 'app' (GitHub App) ou 'pat' (GITHUB_TOKEN)"
+        )
+    config = replace(config, github_token=token)
     
     print(f"🔧 Configurações:")
-    print(f"   Organização: {config['github_org']}")
-    print(f"   Arquivo de labels: {config['labels_file']}")
-    print(f"   Token (App): {config['github_token'][:8]}...")
-    
-    return True
+    print(f"   Organização: {config.github_org}")
+    print(f"   Arquivo de labels: {config.labels_file}")
+    print(f"   Token ({'PAT' if auth_mode == 'pat' else 'App'}): {config.github_token[:8]}...")
+    return config
 
 
-def run_projects_panels(org: str, verbose: bool = False, output: str = None, list_output: str = None,
-                       force_refresh: bool = False, cache_dir: str = 'logs/cache') -> bool:
-    """Executa o script projects_panels.py"""
+def _run_safely(description: str, fn, *args, **kwargs) -> bool:
+    """Executa uma operação do CLI, registrando o erro em vez de propagá-lo
+
+    Retorna False se a operação falhar (exceção ou retorno False).
+    """
     try:
-        print(f"\n📊 Atualizando dados dos projetos da organização: {org}")
-        
-        # Simular argumentos para o script projects_panels.py
-        import sys
-        original_argv = sys.argv.copy()
-        
-        # Configurar argumentos para projects_panels.py
-        sys.argv = ['projects_panels.py', '--org', org, '--cache-dir', cache_dir]
-        if output:
-            sys.argv.extend(['--output', output])
-        if list_output:
-            sys.argv.extend(['--list-output', list_output])
-        if verbose:
-            sys.argv.append('--verbose')
-        if force_refresh:
-            sys.argv.append('--force-refresh')
-        
-        # Executar o script
-        projects_panels_main()
-        
-        # Restaurar argumentos originais
-        sys.argv = original_argv
-        
-        print("✅ Dados dos projetos atualizados com sucesso!")
-        return True
-        
+        return fn(*args, **kwargs) is not False
     except Exception as e:
-        print(f"❌ Erro ao atualizar dados dos projetos: {e}")
-        logging.error(f"Erro ao atualizar dados dos projetos: {e}")
+        print(f"❌ Erro ao {description}: {e}")
+        logging.error("Erro ao %s: %s", description, e)
+        return False
+
+
+def run_projects_panels(org: str, verbose: bool = False, output: str = None, list_output: str = None,
+                       force_refresh: bool = False, cache_dir: str = 'logs/cache',
+                       only_info: bool = False, only_list: bool = False) -> bool:
+    """Executa o script projects_panels.py"""
+    print(f"\n📊 Atualizando dados dos projetos da organização: {org}")
+    from scripts.projects_panels import run as projects_panels_run
+
+    if not projects_panels_run(
+        org=org,
+        output=output,
+        list_output=list_output,
+        only_info=only_info,
+        only_list=only_list,
+        verbose=verbose,
+        force_refresh=force_refresh,
+        cache_dir=cache_dir,
+    ):
         return False
 
+    print("✅ Dados dos projetos atualizados com sucesso!")
+    return True
+
 
 def run_issues_close_date(org: str, panel: bool = False, projects: str = None, 
                          field: str = 'Data Fim', verbose: bool = False, 
@@ -118,85 +373,313 @@ def run_issues_close_date(org: str, panel: bool = False, projects: str = None,
                          force_refresh: bool = False, cache_dir: str = 'logs/cache',
                          skip_cache: bool = False) -> bool:
     """Executa o script issues_close_date.py"""
+    print(f"\n🔧 Gerenciando campo '{field}' em projetos da organização: {org}")
+    from scripts.issues_close_date import run as issues_close_date_run
+
+    options = {}
+    if repos_file:
+        options['repos_file'] = repos_file
+    if projects_list:
+        options['projects_panels_list'] = projects_list
+
+    issues_close_date_run(
+        org=org,
+        panel=panel,
+        projects=None if panel else projects,
+        field=field,
+        days=days,
+        all_issues=all_issues,
+        force_refresh=force_refresh,
+        cache_dir=cache_dir,
+        skip_cache=skip_cache,
+        verbose=verbose,
+        **options,
+    )
+
+    print("✅ Gerenciamento de issues concluído com sucesso!")
+    return True
+
+
+def _do_list_repos(config: Config, args) -> bool:
+    """Lista os repositórios da organização e exporta config/repos_list.csv"""
+    print(f"\n📊 Listando repositórios da organização: {config.github_org}")
+    from scripts.cache_manager import CacheManager
+    from scripts.repos_list import iter_github_repos, export_to_csv
+    cache_manager = CacheManager(cache_dir=args.cache_dir)
+    repos = iter_github_repos(config.github_org, config.github_token,
+                              cache_manager, args.force_refresh, config.session)
+    
+    # Exporta para CSV à medida que as páginas chegam, guardando a prévia;
+    # a listagem completa fica em memória (listed_repos) para os comandos seguintes
+    first_five = []
+    def _with_preview(items):
+        for repo in items:
+            if len(first_five) < 5:
+                first_five.append({'name': repo['name'], 'language': repo.get('language') or 'N/A'})
+            yield repo
+    
+    filename = CONFIG_DIR / 'repos_list.csv'
+    total = export_to_csv(_with_preview(repos), str(filename))
+    
+    if total:
+        # Mostra alguns exemplos
+        print(f"\n📋 Primeiros 5 repositórios encontrados:")
+        for repo in first_five:
+            print(f"   - {repo['name']} ({repo['language']})")
+    
+        print(f"✅ Total de repositórios: {total}")
+    else:
+        print("❌ Nenhum repositório encontrado")
+        return False
+    return True
+
+
+def _do_sync_org(config: Config, args) -> bool:
+    """Sincroniza as labels padrão da organização (repository defaults)"""
+    from scripts.repos_list import sync_organization_labels
+    sync_organization_labels(config.github_org, config.github_token, config.labels_file)
+    return True
+
+
+def _do_sync_labels(config: Config, args) -> bool:
+    """Sincroniza as labels do YAML nos repositórios da organização"""
+    print(f"\n🏷️  Sincronizando labels nos repositórios da organização: {config.github_org}")
+    
+    # Carregar labels do arquivo YAML
+    from scripts.labels_sync import load_labels_from_yaml
+    labels = load_labels_from_yaml(config.labels_file)
+    if not labels:
+        print("❌ Não foi possível carregar as labels")
+        return False
+    
+    # Valores usados repetidamente (inclusive no laço de sincronização)
+    org = config.github_org
+    token = _current_token(config)
+    # --delete-extras / --no-delete-extras têm prioridade sobre GITHUB_DELETE_EXTRAS
+    delete_extras = config.delete_extras if args.delete_extras is None else args.delete_extras
+    
+    # Informa sobre o comportamento de deleção
+    if delete_extras:
+        print("🗑️  Modo completo: labels extras serão removidas automaticamente")
+    else:
+        print("⚠️  Modo conservador: labels extras NÃO serão removidas (padrão)")
+    
+    # Carrega repositórios (específicos ou todos)
+    from scripts.repos_list import listed_repos
+    archived_remote = 0
+    if args.repos:
+        from scripts.labels_sync import load_repos, split_repo_names
+        # Lista separada por vírgula já é passada separada; senão é um CSV
+        repos_input = split_repo_names(args.repos) if ',' in args.repos else args.repos
+        repos = load_repos(repos_input, org)
+        if not repos:
+            print("❌ Nenhum repositório encontrado na lista especificada")
+            return False
+        print(f"🎯 Sincronizando {len(repos)} repositórios específicos")
+    elif listed_repos(org) is not None:
+        # Reaproveita a listagem feita por --repos-list nesta mesma execução
+        repos = listed_repos(org)
+        print(f"📦 Reaproveitando os {len(repos)} repositórios listados nesta execução")
+    else:
+        # Só os ativos, já filtrados pela API; REST (com cache) como alternativa
+        from scripts.repos_list import get_github_repos_graphql
+        try:
+            result = get_github_repos_graphql(org, token, session=config.session)
+            repos = result['repositories']
+            archived_remote = result['archived_count']
+        except Exception as e:
+            logger.warning("Consulta GraphQL de repositórios falhou (%s); usando REST", e)
+            from scripts.cache_manager import CacheManager
+            from scripts.repos_list import get_github_repos
+            cache_manager = CacheManager(cache_dir=args.cache_dir)
+            repos = get_github_repos(org, token, cache_manager, args.force_refresh,
+                                     config.session)
+    
+    if not repos:
+        print("❌ Nenhum repositório encontrado para sincronizar")
+        return False
+    
+    # Sumário de coleta
+    print("")
+    print(f"📊 Total de repositórios coletados: {len(repos)}")
+    print("")
+    
+    # Sincroniza labels em cada repositório com cabeçalho padronizado
+    success_count = 0
+    total_deleted = 0
+    total_errors = 0
+    total_processed = 0
+    total_created = 0
+    total_updated_name = 0
+    total_adjusted_color = 0
+    total_adjusted_description = 0
+    total_unchanged = 0
+    # Separa os arquivados uma única vez; só os ativos vão para o pool
+    # (na consulta GraphQL os arquivados já vêm excluídos e apenas contados)
+    archived = [r for r in repos if r.get('archived', False)]
+    active = [r for r in repos if not r.get('archived', False)]
+    archived_count = len(archived) + archived_remote
+    if archived_count:
+        print(f"⏭️  {archived_count} repositórios arquivados ignorados")
+        logging.debug("Repositórios arquivados ignorados: %s",
+                      ", ".join(r['name'] for r in archived))
+    
+    # Repositórios sincronizados sem erros com o mesmo template (e modo) em
+    # uma execução anterior, dentro do TTL do cache 'labels', são pulados
+    # sem consultar a API; --force-refresh ignora o estado gravado
+    from scripts.cache_manager import CacheManager
+    from scripts.labels_sync import (label_sync_fingerprint, load_label_sync_state,
+                                     save_label_sync_state)
+    state_cache = CacheManager(cache_dir=args.cache_dir)
+    fingerprint = label_sync_fingerprint(labels, delete_extras)
+    sync_state = {} if args.force_refresh else load_label_sync_state(state_cache, org)
+    in_sync = [r for r in active if sync_state.get(r['name']) == fingerprint]
+    if in_sync:
+        active = [r for r in active if sync_state.get(r['name']) != fingerprint]
+        print(f"✅ {len(in_sync)} repositórios já sincronizados em execução anterior (estado em cache)")
+        success_count += len(in_sync)
+        total_processed += len(in_sync) * len(labels)
+        total_unchanged += len(in_sync) * len(labels)
+    
+    # Labels atuais de todos os repositórios ativos em poucas consultas GraphQL;
+    # os que ficarem de fora são consultados via REST dentro do pool
+    from scripts.labels_sync import batch_fetch_labels
     try:
-        print(f"\n🔧 Gerenciando campo '{field}' em projetos da organização: {org}")
-        
-        # Simular argumentos para o script issues_close_date.py
-        import sys
-        original_argv = sys.argv.copy()
-        
-        # Configurar argumentos para issues_close_date.py
-        sys.argv = ['issues_close_date.py', '--org', org, '--field', field, '--cache-dir', cache_dir]
-        
-        if panel:
-            sys.argv.append('--panel')
-        elif projects:
-            sys.argv.extend(['--projects', projects])
-        
-        if repos_file:
-            sys.argv.extend(['--repos-file', repos_file])
-        if projects_list:
-            sys.argv.extend(['--projects-panels-list', projects_list])
-        
-        # Filtro por data
-        if all_issues:
-            sys.argv.append('--all-issues')
-        else:
-            sys.argv.extend(['--days', str(days)])
-
-        if verbose:
-            sys.argv.append('--verbose')
-        if force_refresh:
-            sys.argv.append('--force-refresh')
-        if skip_cache:
-            sys.argv.append('--skip-cache')
-        
-        # Executar o script
-        issues_close_date_main()
-        
-        # Restaurar argumentos originais
-        sys.argv = original_argv
-        
-        print("✅ Gerenciamento de issues concluído com sucesso!")
-        return True
-        
+        current_by_repo = batch_fetch_labels(org, [r['name'] for r in active], token,
+                                             session=config.session)
     except Exception as e:
-        print(f"❌ Erro ao gerenciar issues: {e}")
-        logging.error(f"Erro ao gerenciar issues: {e}")
-        return False
+        logger.warning("Consulta em lote das labels falhou (%s); usando REST por repositório", e)
+        current_by_repo = {}
+    
+    # Sincroniza os repositórios em paralelo (I/O de rede); cada repositório
+    # sai em um único print, sem disputar o stdout linha a linha
+    workers = int(os.getenv('GH_SYNC_WORKERS', str(DEFAULT_SYNC_WORKERS)))
+    total_active = len(active)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # Saída de cada repositório guardada à parte e impressa de uma vez,
+        # junto com o cabeçalho, quando ele termina (sem linhas intercaladas)
+        futures = {}
+        for repo in active:
+            lines = []
+            future = executor.submit(_sync_repo_labels, repo['name'], labels, config,
+                                     delete_extras, current_by_repo.get(repo['name']),
+                                     out=lines.append)
+            futures[future] = (repo, lines)
+        for idx, future in enumerate(as_completed(futures), start=1):
+            repo, lines = futures[future]
+            repo_name = repo['name']
+            print("\n".join([f"📁 Repositório {idx}/{total_active}: {repo_name}", *lines]))
+            try:
+                success_repo, deleted_repo, errors_repo, details = future.result()
+            except Exception as e:
+                logger.error("Erro ao sincronizar %s: %s", repo_name, e)
+                sync_state.pop(repo_name, None)
+                continue
+            get_detail = details.get
+            if errors_repo:
+                sync_state.pop(repo_name, None)
+            else:
+                sync_state[repo_name] = fingerprint
 
+            success_count += 1
+            total_deleted += deleted_repo
+            total_errors += errors_repo
+            total_processed += get_detail('processed', 0)
+            total_created += get_detail('created', 0)
+            total_updated_name += get_detail('updated_name', 0)
+            total_adjusted_color += get_detail('adjusted_color', 0)
+            total_adjusted_description += get_detail('adjusted_description', 0)
+            total_unchanged += get_detail('unchanged', 0)
+            logger.debug("Repositório %d/%d sincronizado: %s (%d erros)",
+                         idx, total_active, repo_name, errors_repo)
+    save_label_sync_state(state_cache, org, sync_state)
+    
+    # Linha em branco antes do relatório final
+    print("")
+    print(f"✅ Sincronização concluída! {success_count}/{len(repos) + archived_remote} repositórios processados")
+    print("")
+    print("============================================================")
+    print("📋 RELATÓRIO FINAL")
+    print("- Repositórios")
+    print(f"  - Total: {len(repos) + archived_remote}")
+    print(f"  - Processados: {success_count}")
+    print(f"  - Arquivados (ignorados): {archived_count}")
+    print(f"  - Com erro: {total_errors}")
+    print("")
+    print("- Labels (agregadas)")
+    print(f"  - Processadas: {total_processed}")
+    print(f"  - Criadas: {total_created}")
+    print(f"  - Atualizadas (nome): {total_updated_name}")
+    print(f"  - Ajustes de cor: {total_adjusted_color}")
+    print(f"  - Ajustes de descrição: {total_adjusted_description}")
+    print(f"  - Deletadas (extras): {total_deleted}")
+    print(f"  - Inalteradas: {total_unchanged}")
+    print(f"  - Erros: {total_errors}")
+    print("")
+    print("- Observações")
+    print(f"  - Modo: {'Modo completo (labels extras removidas)' if delete_extras else 'Modo conservador (labels extras preservadas)'}")
+    print(f"  - Template: {config.labels_file}")
+    print("============================================================")
+    return True
 
-def main():
-    """Função principal"""
+
+def _do_projects_panels(config: Config, args) -> bool:
+    """Atualiza os dados (info) e/ou a lista de projetos da organização"""
+    # Determinar quais saídas gerar
+    generate_info = args.projects_panels_info or args.projects_panels_update or args.all
+    generate_list = args.projects_panels_list or args.projects_panels_update or args.all
+    return run_projects_panels(
+        config.github_org,
+        args.verbose,
+        (args.projects_panels_output if generate_info else None),
+        (args.projects_panels_list_output if generate_list else None),
+        args.force_refresh,
+        args.cache_dir,
+        only_info=generate_info and not generate_list,
+        only_list=generate_list and not generate_info,
+    )
+
+
+def _do_issues_close_date(config: Config, args) -> bool:
+    """Gerencia o campo de data de fechamento das issues nos projetos"""
+    # Só usar modo interativo se explicitamente solicitado
+    return run_issues_close_date(
+        config.github_org,
+        panel=args.issues_close_date_panel,
+        projects=args.issues_close_date_panels,
+        field=args.issues_close_date_field,
+        verbose=args.verbose,
+        repos_file=args.issues_repos_file,
+        projects_list=args.issues_projects_list,
+        days=args.issues_days,
+        all_issues=args.issues_all,
+        force_refresh=args.force_refresh,
+        cache_dir=args.cache_dir,
+        skip_cache=args.skip_cache
+    )
+
+
+# Comandos do CLI, executados nesta ordem:
+# (descrição, flags que ativam o comando, incluído em --all, função)
+COMMANDS = [
+    ("listar repositórios", ('repos_list',), True, _do_list_repos),
+    ("sincronizar labels da organização", ('sync_org',), False, _do_sync_org),
+    ("sincronizar os repositórios", ('sync_labels',), True, _do_sync_labels),
+    ("atualizar dados dos projetos",
+     ('projects_panels_info', 'projects_panels_list', 'projects_panels_update'), True,
+     _do_projects_panels),
+    ("gerenciar issues", ('issues_close_date', 'issues_close_date_panel'), True,
+     _do_issues_close_date),
+]
+
+
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Monta o parser da linha de comando (uma única vez por processo)"""
     parser = argparse.ArgumentParser(
         description="GitHub Organization Management Tool",
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Exemplos de uso:
-  # Labels e repositórios
-  python main.py --repos-list                  # Lista repositórios
-  python main.py --sync-labels           # Sincroniza labels nos repositórios
-  python main.py --all                         # Executa todas as operações
-  python main.py --verbose                     # Modo verboso
-  python main.py --sync-labels --delete-extras  # Sincroniza e remove labels extras
-  python main.py --org minha-org --repos repo1,repo2  # Sincroniza repositórios específicos
-  python main.py --labels /caminho/labels.yaml  # Usa arquivo de labels customizado
-  
-  # Projetos GitHub
-  python main.py --projects-panels-info        # Atualiza dados completos dos projetos (projects-panels-info.yml)
-  python main.py --projects-panels-list        # Atualiza lista de projetos (projects-panels-list.yml)
-  python main.py --projects-panels-update      # Atualiza ambos: info e lista
-  python main.py --projects-output "meus_projetos.yml"  # Arquivo de saída customizado
-  python main.py --projects-panels-list-output "lista.yml"     # Arquivo de lista customizado
-  
-  # Issues e campos de data
-  python main.py --issues-close-date           # Gerencia campo Data Fim em projetos
-  python main.py --issues-close-date-panel                # Seleção interativa de projetos para issues
-  python main.py --issues-close-date-panels "1,2,3"     # Projetos específicos para issues
-  python main.py --issues-close-date-field "Data Conclusão"  # Campo customizado para issues
-  python main.py --issues-repos-file "repos.csv"  # Arquivo de repositórios customizado
-  python main.py --issues-projects-list "projetos.yml"  # Arquivo de projetos customizado
-        """
+        epilog=_USAGE_EXAMPLES
     )
     
     # Argumentos
@@ -204,12 +687,17 @@ Exemplos de uso:
                        help='Lista repositórios da organização')
     parser.add_argument('--sync-labels', action='store_true',
                        help='Sincroniza labels em todos os repositórios')
+    parser.add_argument('--sync-org', action='store_true',
+                       help='Sincroniza as labels padrão da organização')
     parser.add_argument('--all', action='store_true',
                        help='Executa todas as operações')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Modo verboso com mais detalhes')
-    parser.add_argument('--delete-extras', action='store_true',
-                       help='Deleta labels extras para manter 100% sincronizado')
+    delete_group = parser.add_mutually_exclusive_group()
+    delete_group.add_argument('--delete-extras', action='store_true', default=None,
+                              help='Deleta labels extras para manter 100%% sincronizado')
+    delete_group.add_argument('--no-delete-extras', action='store_false', dest='delete_extras',
+                              help='Preserva labels extras (padrão, salvo GITHUB_DELETE_EXTRAS=true)')
     parser.add_argument('--org', type=str, help='Organização específica para sincronizar')
     parser.add_argument('--repos', type=str, help='Repositórios específicos (CSV ou lista separada por vírgula)')
     parser.add_argument('--labels', type=str, help='Arquivo de labels customizado')
@@ -254,6 +742,17 @@ Exemplos de uso:
     parser.add_argument('--cache-stats', action='store_true',
                        help='Show cache statistics')
     
+    return parser
+
+
+def main():
+    """Função principal"""
+    # Sem argumentos: ajuda estática, sem montar o parser
+    if len(sys.argv) == 1:
+        print(_STATIC_HELP)
+        return
+    
+    parser = _build_parser()
     args = parser.parse_args()
     
     # Mostrar estatísticas de cache se solicitado
@@ -263,17 +762,8 @@ Exemplos de uso:
         log_cache_stats(cache_manager)
         return
     
-    # Se nenhum argumento foi fornecido, mostra ajuda
-    if not any([
-        args.repos_list,
-        args.sync_labels,
-        args.all,
-        args.projects_panels_info,
-        args.projects_panels_list,
-        args.projects_panels_update,
-        args.issues_close_date,
-        args.issues_close_date_panel,
-    ]):
+    # Se nenhum comando foi solicitado, mostra ajuda
+    if not args.all and not any(getattr(args, flag) for _, flags, _, _ in COMMANDS for flag in flags):
         parser.print_help()
         return
     
@@ -285,237 +775,24 @@ Exemplos de uso:
     
     # Aplica argumentos da linha de comando (maior prioridade)
     if args.org:
-        config['github_org'] = args.org
+        config = replace(config, github_org=args.org)
     if args.labels:
-        config['labels_file'] = args.labels
-    
-    # Valida configuração
-    if not validate_config(config):
-        sys.exit(1)
-    
-    print(f"\n🚀 Iniciando GitHub Organization Management Tool")
-    print(f"{'='*60}")
+        config = replace(config, labels_file=args.labels)
     
     success = True
     
     try:
+        # Valida configuração
+        config = ensure_config(config)
+        config = replace(config, session=_make_session())
         
-        if args.all or args.repos_list:
-            try:
-                print(f"\n📊 Listando repositórios da organização: {config['github_org']}")
-                from scripts.cache_manager import CacheManager
-                cache_manager = CacheManager(cache_dir=args.cache_dir)
-                repos = get_github_repos(config['github_org'], config['github_token'], 
-                                       cache_manager, args.force_refresh)
-                
-                if repos:
-                    # Cria diretório config se não existir
-                    config_dir = Path('config')
-                    config_dir.mkdir(exist_ok=True)
-                    
-                    # Exporta para CSV
-                    filename = config_dir / 'repos_list.csv'
-                    export_to_csv(repos, str(filename))
-                    
-                    # Mostra alguns exemplos
-                    print(f"\n📋 Primeiros 5 repositórios encontrados:")
-                    for repo in repos[:5]:
-                        print(f"   - {repo['name']} ({repo.get('language', 'N/A')})")
-                    
-                    print(f"✅ Total de repositórios: {len(repos)}")
-                else:
-                    print("❌ Nenhum repositório encontrado")
-                    success = False
-            except Exception as e:
-                print(f"❌ Erro ao listar repositórios: {e}")
-                logging.error(f"Erro ao listar repositórios: {e}")
-                success = False
-        
-        if args.all or args.sync_labels:
-            try:
-                print(f"\n🏷️  Sincronizando labels nos repositórios da organização: {config['github_org']}")
-                
-                # Carregar labels do arquivo YAML
-                from scripts.labels_sync import load_labels_from_yaml
-                labels = load_labels_from_yaml(config['labels_file'])
-                if not labels:
-                    print("❌ Não foi possível carregar as labels")
-                    success = False
-                    return
-                
-                # Informa sobre o comportamento de deleção
-                if args.delete_extras:
-                    print("🗑️  Modo completo: labels extras serão removidas automaticamente")
-                else:
-                    print("⚠️  Modo conservador: labels extras NÃO serão removidas (padrão)")
-                
-                # Carrega repositórios (específicos ou todos)
-                if args.repos:
-                    from scripts.labels_sync import load_repos
-                    repos = load_repos(args.repos, config['github_org'])
-                    if not repos:
-                        print("❌ Nenhum repositório encontrado na lista especificada")
-                        success = False
-                        return
-                    print(f"🎯 Sincronizando {len(repos)} repositórios específicos")
-                else:
-                    from scripts.cache_manager import CacheManager
-                    cache_manager = CacheManager(cache_dir=args.cache_dir)
-                    repos = get_github_repos(config['github_org'], config['github_token'], 
-                                           cache_manager, args.force_refresh)
-                
-                if not repos:
-                    print("❌ Nenhum repositório encontrado para sincronizar")
-                    success = False
-                else:
-                    # Sumário de coleta
-                    print("")
-                    print(f"📊 Total de repositórios coletados: {len(repos)}")
-                    print("")
-
-                    # Sincroniza labels em cada repositório com cabeçalho padronizado
-                    success_count = 0
-                    total_deleted = 0
-                    total_errors = 0
-                    total_processed = 0
-                    total_created = 0
-                    total_updated_name = 0
-                    total_adjusted_color = 0
-                    total_adjusted_description = 0
-                    total_unchanged = 0
-                    for idx, repo in enumerate(repos, start=1):
-                        if repo.get('archived', False):
-                            print(f"⏭️  Pulando repositório arquivado: {repo['name']}")
-                            continue
-
-                        print(f"📁 Repositório {idx}/{len(repos)}: {repo['name']}")
-                        try:
-                            result = sync_labels_for_repo(
-                                repo['name'],
-                                labels,
-                                config['github_token'],
-                                config['github_org'],
-                                delete_extras=args.delete_extras
-                            )
-                            # Unpack results (retrocompat: 3 or 4-tuple)
-                            if isinstance(result, tuple) and len(result) == 4:
-                                success_repo, deleted_repo, errors_repo, details = result
-                            else:
-                                success_repo, deleted_repo, errors_repo = result
-                                details = {
-                                    'processed': success_repo + errors_repo,
-                                    'created': 0,
-                                    'updated_name': 0,
-                                    'adjusted_color': 0,
-                                    'adjusted_description': 0,
-                                    'deleted': deleted_repo,
-                                    'unchanged': 0,
-                                    'errors': errors_repo,
-                                }
-
-                            success_count += 1
-                            total_deleted += deleted_repo
-                            total_errors += errors_repo
-                            total_processed += details.get('processed', 0)
-                            total_created += details.get('created', 0)
-                            total_updated_name += details.get('updated_name', 0)
-                            total_adjusted_color += details.get('adjusted_color', 0)
-                            total_adjusted_description += details.get('adjusted_description', 0)
-                            total_unchanged += details.get('unchanged', 0)
-                        except Exception as e:
-                            print(f"❌ Erro ao sincronizar {repo['name']}: {e}")
-                            logging.error(f"Erro ao sincronizar {repo['name']}: {e}")
-                        # Linha em branco entre repositórios para legibilidade
-                        if idx < len(repos):
-                            print("")
-                    
-                    # Linha em branco antes do relatório final
-                    print("")
-                    print(f"✅ Sincronização concluída! {success_count}/{len(repos)} repositórios processados")
-                    print("")
-                    print("============================================================")
-                    print("📋 RELATÓRIO FINAL")
-                    print("- Repositórios")
-                    print(f"  - Total: {len(repos)}")
-                    archived_count = sum(1 for r in repos if r.get('archived', False))
-                    print(f"  - Processados: {success_count}")
-                    print(f"  - Arquivados (ignorados): {archived_count}")
-                    print(f"  - Com erro: {total_errors}")
-                    print("")
-                    print("- Labels (agregadas)")
-                    print(f"  - Processadas: {total_processed}")
-                    print(f"  - Criadas: {total_created}")
-                    print(f"  - Atualizadas (nome): {total_updated_name}")
-                    print(f"  - Ajustes de cor: {total_adjusted_color}")
-                    print(f"  - Ajustes de descrição: {total_adjusted_description}")
-                    print(f"  - Deletadas (extras): {total_deleted}")
-                    print(f"  - Inalteradas: {total_unchanged}")
-                    print(f"  - Erros: {total_errors}")
-                    print("")
-                    print("- Observações")
-                    print(f"  - Modo: {'Modo completo (labels extras removidas)' if args.delete_extras else 'Modo conservador (labels extras preservadas)'}")
-                    print(f"  - Template: {config['labels_file']}")
-                    print("============================================================")
-            except Exception as e:
-                print(f"❌ Erro na sincronização dos repositórios: {e}")
-                logging.error(f"Erro na sincronização dos repositórios: {e}")
-                success = False
-        
-        # Executar comandos de projetos
-        if args.all or args.projects_panels_info or args.projects_panels_list or args.projects_panels_update:
-            try:
-                # Determinar quais saídas gerar
-                generate_info = args.projects_panels_info or args.projects_panels_update or args.all
-                generate_list = args.projects_panels_list or args.projects_panels_update or args.all
-                # Passar flags específicas para forçar modo apenas info/lista
-                # Implementado via sys.argv dentro do script projects_panels.py
-                # Usamos convenção: quando só um estiver ativo, passamos only-<tipo>
-                if generate_info and not generate_list:
-                    # Apenas info
-                    os.environ["PROJECTS_ONLY_MODE"] = "info"
-                elif generate_list and not generate_info:
-                    os.environ["PROJECTS_ONLY_MODE"] = "list"
-                else:
-                    os.environ.pop("PROJECTS_ONLY_MODE", None)
-
-                if not run_projects_panels(
-                    config['github_org'],
-                    args.verbose,
-                    (getattr(args, 'projects_output', None) if generate_info else None),
-                    (getattr(args, 'projects_panels_list_output', None) if generate_list else None),
-                    args.force_refresh,
-                    args.cache_dir
-                ):
-                    success = False
-            except Exception as e:
-                print(f"❌ Erro ao executar projects_panels: {e}")
-                logging.error(f"Erro ao executar projects_panels: {e}")
-                success = False
+        print(f"\n🚀 Iniciando GitHub Organization Management Tool")
+        print(f"{'='*60}")
         
-        # Executar comandos de issues
-        if args.all or args.issues_close_date or args.issues_close_date_panel:
-            try:
-                # Só usar modo interativo se explicitamente solicitado
-                panel_mode = args.issues_close_date_panel
-                if not run_issues_close_date(
-                    config['github_org'], 
-                    panel=panel_mode,
-                    projects=args.issues_close_date_panels,
-                    field=args.issues_close_date_field,
-                    verbose=args.verbose,
-                    repos_file=args.issues_repos_file,
-                    projects_list=args.issues_projects_list,
-                    days=args.issues_days,
-                    all_issues=args.issues_all,
-                    force_refresh=args.force_refresh,
-                    cache_dir=args.cache_dir,
-                    skip_cache=args.skip_cache
-                ):
-                    success = False
-            except Exception as e:
-                print(f"❌ Erro ao executar issues_close_date: {e}")
-                logging.error(f"Erro ao executar issues_close_date: {e}")
-                success = False
+        run_all = args.all
+        for description, flags, in_all, command in COMMANDS:
+            if (run_all and in_all) or any(getattr(args, flag) for flag in flags):
+                success &= _run_safely(description, command, config, args)
         
         # Resultado final
         print(f"\n{'='*60}")
@@ -525,12 +802,15 @@ Exemplos de uso:
             print("⚠️  Algumas operações falharam. Verifique os logs para mais detalhes.")
             sys.exit(1)
             
+    except ConfigError as e:
+        print(e)
+        sys.exit(1)
     except KeyboardInterrupt:
         print("\n\n⏹️  Operação interrompida pelo usuário")
         sys.exit(1)
     except Exception as e:
         print(f"\n❌ Erro inesperado: {e}")
-        logging.error(f"Erro inesperado: {e}")
+        logging.error("Erro inesperado: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
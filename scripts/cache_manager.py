@@ -2,13 +2,76 @@
 """
 Sistema de cache inteligente para dados do GitHub.
 """
-import json
-import pickle
 import hashlib
-from datetime import datetime, timedelta
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union
-import yaml
+from typing import Dict, Any, IO, Iterable, Optional, Set, Tuple
+from scripts import fast_json
+
+try:
+    import msgpack
+except ImportError:  # msgpack é opcional; sem ele tudo é gravado em JSON
+    msgpack = None
+
+try:
+    import xxhash
+except ImportError:  # xxhash é opcional; BLAKE2b (stdlib) como alternativa
+    xxhash = None
+
+
+def _key_digest(data: bytes) -> str:
+    """Hash não criptográfico de 64 bits (hex) para nomes de arquivo de cache."""
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _shard_of(issue_id: str) -> int:
+    """Shard (0..STATE_SHARDS-1) do estado em que um issue é gravado."""
+    data = str(issue_id).encode()
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data) & (STATE_SHARDS - 1)
+    return hashlib.blake2b(data, digest_size=8).digest()[-1] & (STATE_SHARDS - 1)
+
+
+def _content_hasher():
+    """Hasher incremental não criptográfico de 128 bits para detectar mudanças em dados."""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+# Arquivos (shards) em que o estado de issues de cada repositório é dividido
+STATE_SHARDS = 16
+
+# Campos de texto do issue que entram em get_issue_hash (além de id e projectItems)
+ISSUE_HASH_FIELDS = ('state', 'closedAt', 'updatedAt')
+
+# Versão do estado de issues, parte das chaves do snapshot e do journal.
+# Mudou o cálculo de get_issue_hash (ou o formato do estado)? Incremente:
+# os arquivos da versão anterior deixam de ser lidos e expiram pelo TTL.
+STATE_VERSION = 2
+
+# Tipos de cache gravados em msgpack (não são lidos por humanos)
+BINARY_CACHE_TYPES = {'issue_processing_state'}
+# Tipos de cache gravados com indentação, por serem lidos por humanos;
+# os demais são gravados em JSON compacto
+PRETTY_CACHE_TYPES = {'projects', 'labels'}
+CACHE_FILE_SUFFIXES = (".json", ".msgpack", ".jsonl")
+
+# get_stats faz os stat() em paralelo a partir deste número de arquivos
+STATS_PARALLEL_MIN_FILES = 64
+STATS_WORKERS = 16
+
+NS_PER_HOUR = 3_600_000_000_000
+
+# Entradas mantidas na LRU em memória de cada CacheManager
+MEMORY_CACHE_SIZE = 256
 
 
 class CacheManager:
@@ -24,64 +87,208 @@ class CacheManager:
             'repositories': 6,   # Repositórios mudam ocasionalmente
             'issues': 1,         # Issues mudam frequentemente
             'labels': 12,        # Labels mudam ocasionalmente
+            'etags': 168,        # ETags de páginas (validadas a cada requisição)
             'state': 0.5         # Estado de processamento (30 min)
         }
+        # TTLs em nanossegundos, comparados direto com st_mtime_ns
+        self._ttl_ns = {cache_type: int(hours * NS_PER_HOUR)
+                        for cache_type, hours in self.ttl_hours.items()}
+        
+        # Hash do conteúdo gravado por este processo em cada arquivo
+        self._last_written: Dict[Path, str] = {}
+        
+        # LRU em memória: (cache_type, key) -> (expira_em em time.monotonic, bytes)
+        # Guarda os dados serializados: cada get() devolve uma cópia nova, e
+        # alterações do chamador não chegam à entrada em cache
+        # (o lock permite usar o mesmo CacheManager em várias threads)
+        self._mem: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._mem_lock = threading.Lock()
+    
+    def _remember(self, mem_key: tuple, buf: bytes, ttl_seconds: float) -> None:
+        """Guarda os dados serializados na LRU em memória pelo tempo de vida restante."""
+        with self._mem_lock:
+            self._mem[mem_key] = (time.monotonic() + ttl_seconds, buf)
+            self._mem.move_to_end(mem_key)
+            if len(self._mem) > MEMORY_CACHE_SIZE:
+                self._mem.popitem(last=False)
+    
+    def _recall(self, mem_key: tuple) -> Optional[Dict[str, Any]]:
+        """Busca os dados na LRU em memória (cópia), descartando a entrada se expirou."""
+        with self._mem_lock:
+            hit = self._mem.get(mem_key)
+            if hit is None:
+                return None
+            expires_at, buf = hit
+            if time.monotonic() >= expires_at:
+                del self._mem[mem_key]
+                return None
+            self._mem.move_to_end(mem_key)
+        return self._deserialize(mem_key[0], buf)
+    
+    @staticmethod
+    def _is_binary(cache_type: str) -> bool:
+        """Indica se o tipo de cache é gravado em msgpack."""
+        return msgpack is not None and cache_type in BINARY_CACHE_TYPES
     
     def _get_cache_path(self, cache_type: str, key: str = None) -> Path:
         """Gera caminho do arquivo de cache."""
+        ext = 'msgpack' if self._is_binary(cache_type) else 'json'
         if key:
             # Hash da chave para evitar caracteres inválidos
-            key_hash = hashlib.md5(key.encode()).hexdigest()[:8]
-            return self.cache_dir / f"{cache_type}_{key_hash}.json"
-        return self.cache_dir / f"{cache_type}.json"
+            key_hash = _key_digest(key.encode())[:8]
+            return self.cache_dir / f"{cache_type}_{key_hash}.{ext}"
+        return self.cache_dir / f"{cache_type}.{ext}"
+    
+    def _serialize(self, cache_type: str, data: Dict[str, Any],
+                   pretty: Optional[bool] = None) -> bytes:
+        """Serializa os dados no formato do tipo de cache."""
+        if self._is_binary(cache_type):
+            return msgpack.packb(data, use_bin_type=True, default=str)
+        if pretty is None:
+            pretty = cache_type in PRETTY_CACHE_TYPES
+        return fast_json.dumps(data, indent=pretty, default=str)
+    
+    def _deserialize(self, cache_type: str, buf: bytes) -> Dict[str, Any]:
+        """Desserializa os dados no formato do tipo de cache."""
+        if self._is_binary(cache_type):
+            return msgpack.unpackb(buf, raw=False, strict_map_key=False)
+        return fast_json.loads(buf)
+    
+    def _ttl(self, cache_type: str) -> int:
+        """TTL do tipo de cache em nanossegundos (1h se não configurado)."""
+        return self._ttl_ns.get(cache_type, NS_PER_HOUR)
     
-    def _is_expired(self, cache_path: Path, ttl_hours: int) -> bool:
-        """Verifica se o cache expirou."""
-        if not cache_path.exists():
+    @staticmethod
+    def _mtime(cache_path: Path) -> Optional[int]:
+        """mtime do arquivo de cache em ns, ou None se ele não existir."""
+        try:
+            return cache_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    @staticmethod
+    def _is_expired(mtime_ns: Optional[int], ttl_ns: int, now_ns: Optional[int] = None) -> bool:
+        """Verifica se o cache (pelo mtime do arquivo, em ns) expirou."""
+        if mtime_ns is None:
             return True
-        
-        file_time = datetime.fromtimestamp(cache_path.stat().st_mtime)
-        expiry_time = file_time + timedelta(hours=ttl_hours)
-        return datetime.now() > expiry_time
+        return (now_ns if now_ns is not None else time.time_ns()) - mtime_ns > ttl_ns
     
-    def get(self, cache_type: str, key: str = None) -> Optional[Dict[str, Any]]:
-        """Recupera dados do cache."""
+    def get(self, cache_type: str, key: str = None, quiet: bool = False) -> Optional[Dict[str, Any]]:
+        """Recupera dados do cache (memória primeiro, depois disco).
+
+        Devolve sempre um objeto novo: o chamador pode alterá-lo sem afetar o cache.
+        """
+        mem_key = (cache_type, key)
+        data = self._recall(mem_key)
+        if data is not None:
+            if not quiet:
+                print(f"📦 Cache hit: {cache_type}" + (f" ({key})" if key else ""))
+            return data
+        
         cache_path = self._get_cache_path(cache_type, key)
-        ttl_hours = self.ttl_hours.get(cache_type, 1)
+        ttl_ns = self._ttl(cache_type)
         
-        if self._is_expired(cache_path, ttl_hours):
+        mtime_ns = self._mtime(cache_path)
+        if self._is_expired(mtime_ns, ttl_ns):
             return None
         
+        # Uma única leitura do arquivo inteiro, decodificado em memória
         try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                print(f"📦 Cache hit: {cache_type}" + (f" ({key})" if key else ""))
-                return data
-        except (json.JSONDecodeError, FileNotFoundError):
+            buf = cache_path.read_bytes()
+        except FileNotFoundError:
             return None
+        try:
+            data = self._deserialize(cache_type, buf)
+        except ValueError:
+            # Cobre JSONDecodeError (json/orjson) e dados msgpack corrompidos
+            return None
+        self._remember(mem_key, buf, (mtime_ns + ttl_ns - time.time_ns()) / 1e9)
+        if not quiet:
+            print(f"📦 Cache hit: {cache_type}" + (f" ({key})" if key else ""))
+        return data
     
-    def set(self, cache_type: str, data: Dict[str, Any], key: str = None) -> None:
-        """Armazena dados no cache."""
+    def set(self, cache_type: str, data: Dict[str, Any], key: str = None,
+            durable: bool = False, quiet: bool = False,
+            pretty: Optional[bool] = None) -> None:
+        """Armazena dados no cache.
+
+        A gravação é atômica (arquivo temporário + os.replace): uma execução
+        interrompida nunca deixa um cache truncado. Com durable=True o arquivo
+        também passa por fsync antes da troca; o padrão dispensa o fsync, pois
+        o cache pode ser reconstruído. O JSON é compacto, exceto para os tipos
+        em PRETTY_CACHE_TYPES (ou se pretty=True).
+
+        Se o conteúdo for idêntico ao já gravado, o arquivo não é reescrito:
+        apenas o mtime é atualizado, renovando o TTL.
+        """
         cache_path = self._get_cache_path(cache_type, key)
+        tmp_path = cache_path.with_suffix(cache_path.suffix + '.tmp')
         
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
-            print(f"💾 Cache stored: {cache_type}" + (f" ({key})" if key else ""))
+            # Serializa tudo antes e grava com uma única escrita
+            buf = self._serialize(cache_type, data, pretty)
+            buf_hash = _key_digest(buf)
+            if self._is_unchanged(cache_path, buf, buf_hash):
+                os.utime(cache_path)
+                self._remember((cache_type, key), buf, self._ttl(cache_type) / 1e9)
+                if not quiet:
+                    print(f"💾 Cache inalterado: {cache_type}" + (f" ({key})" if key else ""))
+                return
+            with open(tmp_path, 'wb') as f:
+                f.write(buf)
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, cache_path)
+            self._last_written[cache_path] = buf_hash
+            self._remember((cache_type, key), buf, self._ttl(cache_type) / 1e9)
+            if not quiet:
+                print(f"💾 Cache stored: {cache_type}" + (f" ({key})" if key else ""))
         except Exception as e:
             print(f"⚠️  Erro ao salvar cache {cache_type}: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+    
+    def _is_unchanged(self, cache_path: Path, buf: bytes, buf_hash: str) -> bool:
+        """Verifica se o arquivo de cache já contém exatamente buf.
+
+        Usa o hash da última gravação deste processo; sem ele, só lê o
+        arquivo existente quando o tamanho coincide.
+        """
+        last = self._last_written.get(cache_path)
+        if last is not None:
+            return last == buf_hash and cache_path.exists()
+        try:
+            if cache_path.stat().st_size != len(buf):
+                return False
+            unchanged = _key_digest(cache_path.read_bytes()) == buf_hash
+        except FileNotFoundError:
+            return False
+        if unchanged:
+            self._last_written[cache_path] = buf_hash
+        return unchanged
     
     def invalidate(self, cache_type: str, key: str = None) -> None:
         """Invalida cache específico."""
+        with self._mem_lock:
+            self._mem.pop((cache_type, key), None)
         cache_path = self._get_cache_path(cache_type, key)
+        self._last_written.pop(cache_path, None)
         if cache_path.exists():
             cache_path.unlink()
             print(f"🗑️  Cache invalidated: {cache_type}" + (f" ({key})" if key else ""))
     
     def clear_all(self) -> None:
         """Limpa todo o cache."""
-        for cache_file in self.cache_dir.glob("*.json"):
-            cache_file.unlink()
+        with self._mem_lock:
+            self._mem.clear()
+        self._last_written.clear()
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(CACHE_FILE_SUFFIXES):
+                    os.unlink(entry.path)
         print("🧹 Cache limpo completamente")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -93,64 +300,202 @@ class CacheManager:
             'expired_files': 0
         }
         
-        for cache_file in self.cache_dir.glob("*.json"):
+        with os.scandir(self.cache_dir) as it:
+            entries = [entry for entry in it if entry.name.endswith(CACHE_FILE_SUFFIXES)]
+        
+        # stat() libera o GIL: com muitos arquivos, as chamadas são sobrepostas em threads
+        if len(entries) >= STATS_PARALLEL_MIN_FILES:
+            with ThreadPoolExecutor(max_workers=STATS_WORKERS) as executor:
+                file_stats = list(executor.map(os.DirEntry.stat, entries))
+        else:
+            file_stats = [entry.stat() for entry in entries]
+        
+        # Um único "agora" para todos os arquivos
+        now_ns = time.time_ns()
+        for entry, st in zip(entries, file_stats):
             stats['total_files'] += 1
-            stats['total_size'] += cache_file.stat().st_size
+            stats['total_size'] += st.st_size
             
             # Extrair tipo do nome do arquivo
-            cache_type = cache_file.stem.split('_')[0]
+            cache_type = entry.name.rsplit('.', 1)[0].split('_')[0]
             if cache_type not in stats['by_type']:
                 stats['by_type'][cache_type] = 0
             stats['by_type'][cache_type] += 1
             
             # Verificar se expirou
-            ttl_hours = self.ttl_hours.get(cache_type, 1)
-            if self._is_expired(cache_file, ttl_hours):
+            if self._is_expired(st.st_mtime_ns, self._ttl(cache_type), now_ns):
                 stats['expired_files'] += 1
         
         return stats
 
 
 class IssueProcessingState:
-    """Gerencia estado de processamento de issues."""
+    """Gerencia estado de processamento de issues.
+
+    O estado de cada repositório é um snapshot (via CacheManager) mais um
+    journal append-only em JSONL: marcar um issue acrescenta uma linha, em
+    vez de regravar o estado inteiro. O journal é compactado no snapshot
+    quando passa de 2x o número de issues, e em close(). Use como context
+    manager (ou chame close()) para gravar o que estiver em buffer.
+
+    O snapshot é dividido em STATE_SHARDS arquivos pelo hash do issue_id;
+    a compactação só regrava os shards com issues marcados desde a última.
+    """
     
     def __init__(self, cache_manager: CacheManager):
         self.cache_manager = cache_manager
         self.state_key = "issue_processing_state"
+        self._state_cache: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._journal_lines: Dict[str, int] = {}
+        self._state_fh: Dict[str, IO[bytes]] = {}
+        self._dirty_shards: Dict[str, Set[int]] = {}
+    
+    def __enter__(self) -> "IssueProcessingState":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def _journal_path(self, repo_name: str) -> Path:
+        """Caminho do journal JSONL de um repositório (ao lado do snapshot)."""
+        return self.cache_manager._get_cache_path(
+            self.state_key, f"v{STATE_VERSION}:{repo_name}").with_suffix('.jsonl')
+    
+    @staticmethod
+    def _shard_key(repo_name: str, shard: int) -> str:
+        """Chave no CacheManager de um shard do estado do repositório."""
+        return f"v{STATE_VERSION}:{repo_name}#{shard}"
+    
+    def _load(self, repo_name: str) -> Dict[str, Dict[str, Any]]:
+        """Carrega snapshot + journal de um repositório (uma vez por execução)."""
+        processed = self._state_cache.get(repo_name)
+        if processed is not None:
+            return processed
+        
+        processed = {}
+        for shard in range(STATE_SHARDS):
+            state = self.cache_manager.get(self.state_key, self._shard_key(repo_name, shard),
+                                           quiet=True) or {}
+            processed.update(state.get('processed_issues', {}))
+        dirty = self._dirty_shards[repo_name] = set()
+        lines = 0
+        journal = self._journal_path(repo_name)
+        ttl_ns = self.cache_manager._ttl(self.state_key)
+        if self.cache_manager._is_expired(self.cache_manager._mtime(journal), ttl_ns):
+            # Apagado antes de qualquer append: reabrir em 'ab' renovaria o mtime
+            # e as linhas vencidas voltariam a ser lidas na próxima execução
+            journal.unlink(missing_ok=True)
+        else:
+            try:
+                for line in journal.read_bytes().splitlines():
+                    try:
+                        entry = fast_json.loads(line)
+                    except ValueError:
+                        continue  # linha truncada por uma execução interrompida
+                    issue_id = entry.pop('issue_id')
+                    processed[issue_id] = entry
+                    dirty.add(_shard_of(issue_id))
+                    lines += 1
+            except FileNotFoundError:
+                pass
+        
+        self._state_cache[repo_name] = processed
+        self._journal_lines[repo_name] = lines
+        return processed
     
     def get_processed_issues(self, repo_name: str) -> Dict[str, Dict[str, Any]]:
-        """Recupera issues já processados de um repositório."""
-        state = self.cache_manager.get(self.state_key, repo_name) or {}
-        return state.get('processed_issues', {})
+        """Recupera issues já processados de um repositório.
+
+        Memoizado por repositório: o disco é lido só na primeira chamada e
+        mark_issues_processed atualiza o mesmo dicionário em memória.
+        """
+        return self._load(repo_name)
     
     def mark_issue_processed(self, repo_name: str, issue_id: str, 
                            issue_data: Dict[str, Any]) -> None:
-        """Marca issue como processado."""
-        state = self.cache_manager.get(self.state_key, repo_name) or {}
-        if 'processed_issues' not in state:
-            state['processed_issues'] = {}
-        
-        state['processed_issues'][issue_id] = {
-            'processed_at': datetime.now().isoformat(),
-            'issue_data': issue_data
-        }
+        """Marca issue como processado (atalho para mark_issues_processed com um item)."""
+        self.mark_issues_processed(repo_name, [(issue_id, issue_data)])
+    
+    def mark_issues_processed(self, repo_name: str,
+                              items: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Marca vários issues (issue_id, issue_data) como processados de uma vez.
+
+        Todas as linhas vão para o journal numa única escrita.
+        """
+        processed = self._load(repo_name)
+        dirty = self._dirty_shards[repo_name]
+        processed_at = datetime.now().isoformat()
+        lines = []
+        for issue_id, issue_data in items:
+            entry = {
+                'processed_at': processed_at,
+                'hash': self.get_issue_hash(issue_data),
+                'issue_data': issue_data
+            }
+            processed[issue_id] = entry
+            dirty.add(_shard_of(issue_id))
+            lines.append(fast_json.dumps({'issue_id': issue_id, **entry}, default=str))
+        if not lines:
+            return
         
-        self.cache_manager.set(self.state_key, state, repo_name)
+        fh = self._state_fh.get(repo_name)
+        if fh is None:
+            fh = self._state_fh[repo_name] = open(self._journal_path(repo_name), 'ab')
+        fh.write(b"\n".join(lines) + b"\n")
+        self._journal_lines[repo_name] += len(lines)
+        
+        if self._journal_lines[repo_name] > 2 * len(processed):
+            self.compact(repo_name)
+    
+    def compact(self, repo_name: str) -> None:
+        """Regrava os shards alterados do repositório e descarta o journal."""
+        if repo_name not in self._state_cache:
+            return
+        fh = self._state_fh.pop(repo_name, None)
+        if fh is not None:
+            fh.close()
+        
+        dirty = self._dirty_shards[repo_name]
+        if dirty:
+            shards: Dict[int, Dict[str, Dict[str, Any]]] = {shard: {} for shard in dirty}
+            for issue_id, entry in self._state_cache[repo_name].items():
+                bucket = shards.get(_shard_of(issue_id))
+                if bucket is not None:
+                    bucket[issue_id] = entry
+            # O journal é apagado em seguida: os shards precisam estar em disco
+            for shard, entries in shards.items():
+                self.cache_manager.set(self.state_key, {'processed_issues': entries},
+                                       self._shard_key(repo_name, shard), durable=True, quiet=True)
+            print(f"💾 Estado de issues salvo: {repo_name} ({len(dirty)} shards)")
+            dirty.clear()
+        try:
+            self._journal_path(repo_name).unlink()
+        except FileNotFoundError:
+            pass
+        self._journal_lines[repo_name] = 0
+    
+    def flush(self) -> None:
+        """Grava em disco as linhas do journal ainda em buffer."""
+        for fh in self._state_fh.values():
+            fh.flush()
+    
+    def close(self) -> None:
+        """Compacta os journals abertos e fecha os arquivos."""
+        for repo_name in list(self._state_fh):
+            self.compact(repo_name)
     
     def get_issue_hash(self, issue_data: Dict[str, Any]) -> str:
         """Gera hash único para issue baseado em dados relevantes."""
-        # Campos que indicam mudança no issue
-        relevant_fields = {
-            'id': issue_data.get('id'),
-            'state': issue_data.get('state'),
-            'closedAt': issue_data.get('closedAt'),
-            'updatedAt': issue_data.get('updatedAt'),
-            'projectItems': issue_data.get('projectItems', {}).get('nodes', [])
-        }
-        
-        # Gerar hash dos campos relevantes
-        hash_string = json.dumps(relevant_fields, sort_keys=True)
-        return hashlib.md5(hash_string.encode()).hexdigest()
+        # Campos que indicam mudança no issue, alimentados direto no hasher
+        h = _content_hasher()
+        h.update(str(issue_data.get('id')).encode())
+        for field in ISSUE_HASH_FIELDS:
+            h.update(b'|')
+            h.update((issue_data.get(field) or '').encode())
+        h.update(b'|')
+        h.update(fast_json.dumps((issue_data.get('projectItems') or {}).get('nodes', []),
+                                 sort_keys=True))
+        return h.hexdigest()
     
     def has_issue_changed(self, repo_name: str, issue_id: str, 
                          current_issue_data: Dict[str, Any]) -> bool:
@@ -160,11 +505,10 @@ class IssueProcessingState:
         if issue_id not in processed_issues:
             return True  # Issue não foi processado antes
         
-        stored_data = processed_issues[issue_id]['issue_data']
-        current_hash = self.get_issue_hash(current_issue_data)
-        stored_hash = self.get_issue_hash(stored_data)
-        
-        return current_hash != stored_hash
+        # Hash gravado ao marcar o issue; estados antigos não o têm
+        stored = processed_issues[issue_id]
+        stored_hash = stored.get('hash') or self.get_issue_hash(stored['issue_data'])
+        return self.get_issue_hash(current_issue_data) != stored_hash
 
 
 def cleanup_expired_cache(cache_manager: CacheManager) -> None:
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Leitura do arquivo .env compartilhada pelo main.py e pelos scripts.
+
+Cada linha KEY=valor vira uma variável de ambiente; comentários e linhas
+inválidas são ignorados, aspas em volta do valor e " # comentário" ao fim
+da linha são removidos. Variáveis já definidas no ambiente (ex: o token
+exportado no shell) têm precedência sobre o arquivo.
+"""
+import os
+import re
+from pathlib import Path
+from typing import Dict, Union
+
+DEFAULT_ENV_FILE = '.env'
+
+# Linhas KEY=valor do .env (comentários e linhas inválidas não casam)
+_ENV_RE = re.compile(
+    r'(?m)^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*'
+    r'(?:"([^"\n]*)"|\'([^\'\n]*)\'|(.*?))(?:[ \t]+#.*?)?[ \t]*\r?$'
+)
+
+
+def parse_env(text: str) -> Dict[str, str]:
+    """Interpreta o conteúdo de um .env em {chave: valor}."""
+    return {key: dq or sq or raw for key, dq, sq, raw in _ENV_RE.findall(text)}
+
+
+def load_env_file(path: Union[str, Path] = DEFAULT_ENV_FILE) -> bool:
+    """Carrega o .env no ambiente sem sobrescrever variáveis já definidas.
+
+    Retorna False se o arquivo não existir.
+    """
+    env_file = Path(path)
+    if not env_file.exists():
+        print(f"⚠️  Arquivo {env_file} não encontrado")
+        return False
+    print(f"📁 Carregando variáveis de {env_file}...")
+    for key, value in parse_env(env_file.read_text(encoding='utf-8')).items():
+        os.environ.setdefault(key, value)
+    print("✅ Variáveis de ambiente carregadas")
+    return True
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Serialização JSON rápida para as respostas da API do GitHub.
+
+Usa orjson quando instalado e cai para o módulo json da stdlib caso
+contrário. A interface segue a do orjson: loads aceita str ou bytes e
+dumps retorna bytes.
+"""
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional
+    orjson = None
+
+
+def loads(data) -> Any:
+    """Decodifica JSON a partir de str ou bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, *, sort_keys: bool = False, indent: bool = False,
+          default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serializa para JSON em UTF-8 (bytes), compacto ou com indentação de 2."""
+    if orjson is not None:
+        # Chaves não-string (ex: int) são aceitas, como no json da stdlib
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option, default=default)
+    return json.dumps(obj, sort_keys=sort_keys, default=default, ensure_ascii=False,
+                      indent=2 if indent else None,
+                      separators=(',', ': ') if indent else (',', ':')).encode('utf-8')
+
+
+def response_json(response) -> Any:
+    """Equivalente a response.json() de requests, decodificando o corpo bruto."""
+    return loads(response.content)
+
+
+def post_json(http, url: str, payload: Any, headers: Optional[dict] = None, **kwargs):
+    """POST com corpo JSON serializado por dumps (http: requests ou Session)."""
+    headers = dict(headers or {})
+    headers.setdefault('Content-Type', 'application/json')
+    return http.post(url, data=dumps(payload), headers=headers, **kwargs)
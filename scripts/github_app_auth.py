@@ -9,22 +9,58 @@ installation access token, que é o token usado nas chamadas à API.
 from __future__ import annotations
 
 import base64
+import functools
 import json
 import os
+import threading
 import time
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
-import jwt  # PyJWT
 import requests
 
 
 GITHUB_API_URL = "https://api.github.com"
 
+# Tempo máximo (s) de conexão e de leitura das chamadas de emissão de token
+TOKEN_REQUEST_TIMEOUT = (3.05, 10)
 
+# Cache do installation token (válido por 1h no GitHub): em memória e em
+# disco, para que execuções e processos vizinhos reaproveitem o mesmo token
+TOKEN_CACHE_FILE = Path("logs") / ".gh_app_token.json"
+TOKEN_CACHE_MARGIN = 300  # renova 5 min antes de expirar
+_token_cache: Optional[Tuple[str, str, float]] = None  # (chave, token, expira_em)
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# Último JWT do App assinado: (app_id, jwt, exp)
+_jwt_cache: Optional[Tuple[str, str, int]] = None
+JWT_REUSE_MARGIN = 15
+
+# Sessão HTTP reaproveitada entre emissões de token (criada no primeiro uso)
+_SESSION: Optional[requests.Session] = None
+
+
+def _session() -> requests.Session:
+    """
+    Retorna a sessão HTTP do módulo, mantendo a conexão TLS com a API
+    aberta entre renovações de token.
+    """
+    global _SESSION
+    if _SESSION is None:
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        session.headers["Accept-Encoding"] = "gzip"
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        _SESSION = session
+    return _SESSION
+
+
+@functools.lru_cache(maxsize=1)
 def _read_private_key_from_env_or_path() -> str:
     """
-    Lê a chave privada do GitHub App.
+    Lê a chave privada do GitHub App (uma vez por processo).
     Prioridade:
       1. GITHUB_APP_PRIVATE_KEY (conteúdo PEM bruto ou base64)
       2. GITHUB_APP_PRIVATE_KEY_PATH (caminho para arquivo .pem)
@@ -52,45 +88,69 @@ def _read_private_key_from_env_or_path() -> str:
     return path.read_text(encoding="utf-8")
 
 
+@functools.lru_cache(maxsize=1)
+def _load_signing_key(private_key_pem: str):
+    """
+    Converte o PEM em um objeto RSAPrivateKey (uma vez por processo), para
+    que o PyJWT não interprete o PEM novamente a cada assinatura.
+    """
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+    return load_pem_private_key(private_key_pem.encode("utf-8"), password=None)
+
+
 def _create_app_jwt(app_id: str, private_key_pem: str) -> str:
     """
     Cria um JWT RS256 com expiração curta (60s) para o GitHub App.
+
+    O JWT assinado é reaproveitado enquanto faltarem mais de
+    JWT_REUSE_MARGIN segundos para expirar (~40s), evitando uma assinatura
+    RSA por chamada.
     """
+    global _jwt_cache
     now = int(time.time())
+    if _jwt_cache and _jwt_cache[0] == app_id and now < _jwt_cache[2] - JWT_REUSE_MARGIN:
+        return _jwt_cache[1]
+
+    # Importado aqui: PyJWT/cryptography só são necessários ao gerar um token
+    # novo (com o token em cache, quem importa este módulo não paga o custo)
+    import jwt  # PyJWT
+
     payload = {
         "iat": now - 5,  # pequena folga de clock skew
         "exp": now + 55,
         "iss": app_id,
     }
-    token = jwt.encode(payload, private_key_pem, algorithm="RS256")
+    token = jwt.encode(payload, _load_signing_key(private_key_pem), algorithm="RS256")
     # PyJWT>=2 retorna str
+    _jwt_cache = (app_id, token, payload["exp"])
     return token
 
 
-def _create_installation_token(app_jwt: str, installation_id: str) -> str:
+def _request_installation_token(app_jwt: str, installation_id: str) -> Dict[str, Any]:
     """
     Troca o JWT do App por um installation access token.
+    Retorna o payload completo da API (inclui ``token`` e ``expires_at``).
     """
     url = f"{GITHUB_API_URL}/app/installations/{installation_id}/access_tokens"
     headers = {
         "Authorization": f"Bearer {app_jwt}",
         "Accept": "application/vnd.github+json",
     }
-    resp = requests.post(url, headers=headers)
+    resp = _session().post(url, headers=headers, timeout=TOKEN_REQUEST_TIMEOUT)
     if resp.status_code not in (200, 201):
+        request_id = resp.headers.get("x-github-request-id", "n/a")
         raise RuntimeError(
-            f"Failed to create installation token ({resp.status_code}): {resp.text}"
+            f"Failed to create installation token ({resp.status_code}, "
+            f"request id {request_id}): {resp.text}"
         )
-    data = resp.json()
-    return data["token"]
+    return resp.json()
 
 
-def get_github_app_installation_token() -> str:
+def get_github_app_installation_token_with_expiry() -> Tuple[str, str]:
     """
-    Obtém um installation token usando envs:
-      - GITHUB_APP_ID
-      - GITHUB_APP_INSTALLATION_ID
-      - GITHUB_APP_PRIVATE_KEY ou GITHUB_APP_PRIVATE_KEY_PATH
+    Igual a get_github_app_installation_token, mas retorna também o
+    ``expires_at`` (ISO 8601) informado pelo GitHub para o token.
     """
     app_id = os.getenv("GITHUB_APP_ID")
     installation_id = os.getenv("GITHUB_APP_INSTALLATION_ID")
@@ -99,6 +159,80 @@ def get_github_app_installation_token() -> str:
 
     private_key_pem = _read_private_key_from_env_or_path()
     app_jwt = _create_app_jwt(app_id, private_key_pem)
-    return _create_installation_token(app_jwt, installation_id)
+    data = _request_installation_token(app_jwt, installation_id)
+    return data["token"], data["expires_at"]
+
+
+def _token_cache_key() -> str:
+    """Chave do cache de token: app_id + installation_id."""
+    return f"{os.getenv('GITHUB_APP_ID')}:{os.getenv('GITHUB_APP_INSTALLATION_ID')}"
+
+
+def _parse_expires_at(value: str) -> float:
+    """Converte o expires_at da API (ex: 2025-01-01T12:00:00Z) em epoch."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _read_token_cache_file(cache_key: str) -> Optional[Tuple[str, float]]:
+    """Lê (token, expira_em) do cache em disco, se for da mesma instalação."""
+    try:
+        cached = json.loads(TOKEN_CACHE_FILE.read_text(encoding="utf-8"))
+        if cached.get("key") == cache_key:
+            return cached["token"], _parse_expires_at(cached["expires_at"])
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def _write_token_cache_file(cache_key: str, token: str, expires_at: str) -> None:
+    """Grava o token em disco, legível apenas pelo dono (contém segredo)."""
+    try:
+        TOKEN_CACHE_FILE.parent.mkdir(exist_ok=True)
+        fd = os.open(TOKEN_CACHE_FILE, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"key": cache_key, "token": token, "expires_at": expires_at}, f)
+    except OSError as e:
+        print(f"⚠️  Não foi possível salvar o token em cache: {e}")
+
+
+def invalidate_cached_token() -> None:
+    """Descarta o token em cache (memória e disco), ex: após um 401."""
+    global _token_cache
+    with _TOKEN_CACHE_LOCK:
+        _token_cache = None
+        try:
+            TOKEN_CACHE_FILE.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def get_github_app_installation_token() -> str:
+    """
+    Obtém um installation token usando envs:
+      - GITHUB_APP_ID
+      - GITHUB_APP_INSTALLATION_ID
+      - GITHUB_APP_PRIVATE_KEY ou GITHUB_APP_PRIVATE_KEY_PATH
+
+    Reaproveita o último token (do processo ou de TOKEN_CACHE_FILE) enquanto
+    faltar mais de TOKEN_CACHE_MARGIN segundos para expirar, evitando assinar
+    um novo JWT e chamar a API a cada uso.
+    """
+    global _token_cache
+    cache_key = _token_cache_key()
+    with _TOKEN_CACHE_LOCK:
+        now = time.time()
+        if _token_cache and _token_cache[0] == cache_key \
+                and _token_cache[2] - now > TOKEN_CACHE_MARGIN:
+            return _token_cache[1]
+
+        cached = _read_token_cache_file(cache_key)
+        if cached and cached[1] - now > TOKEN_CACHE_MARGIN:
+            _token_cache = (cache_key, cached[0], cached[1])
+            return cached[0]
+
+        token, expires_at = get_github_app_installation_token_with_expiry()
+        _token_cache = (cache_key, token, _parse_expires_at(expires_at))
+        _write_token_cache_file(cache_key, token, expires_at)
+        return token
 
 
@@ -23,6 +23,7 @@ Usage:
   python scripts/issues_close_date.py --skip-cache                       # Skip cache completely
   python scripts/issues_close_date.py --projects "1,2,3"                 # Projetos específicos via argumento
   python scripts/issues_close_date.py --org "minha-org" --verbose        # Organização diferente
+  python scripts/issues_close_date.py --dry-run                          # Lista alterações sem aplicá-las
 
 Ordem de prioridade para projeto padrão:
   1. Argumento --projects (maior prioridade)
@@ -35,69 +36,99 @@ from __future__ import annotations
 import argparse
 import csv
 import datetime as dt
+import functools
 import json
+import logging
 import os
+import random
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, List, Literal, NamedTuple, Optional, Tuple
 
 import requests
 import yaml
-from dotenv import load_dotenv
+from scripts import fast_json
+from scripts.env_file import load_env_file
 from scripts.github_app_auth import get_github_app_installation_token
+from scripts.rate_limiter import GHRateLimiter
 from cache_manager import CacheManager, IssueProcessingState, log_cache_stats
 
+# Parser YAML em C (libyaml) quando disponível
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+logger = logging.getLogger(__name__)
+
 # Configurações padrão
 DEFAULT_ORG = 'splor-mg'
 DEFAULT_REPOS_FILE = 'config/repos_list.csv'
 DEFAULT_PROJECTS_LIST = 'config/projects-panels-list.yml'
 DEFAULT_PROJECT_PANEL = 13  # Número do projeto "Gestão à Vista AID"
 DEFAULT_FIELD_NAME = 'Data Fim'
+# Dados completos dos projetos (gerado por projects_panels)
+PROJECTS_INFO_FILE = 'config/projects-panels-info.yml'
 
 GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+GRAPHQL_TIMEOUT = 30  # segundos
 
-def load_dotenv():
-    """Carrega variáveis de ambiente do arquivo .env"""
-    env_file = Path('.env')
-    if env_file.exists():
-        print(f"📁 Carregando variáveis de {env_file}...")
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
-        print("✅ Variáveis de ambiente carregadas")
-    else:
-        print(f"⚠️  Arquivo {env_file} não encontrado")
+# Sessão HTTP do módulo (keep-alive), criada na primeira chamada a _graphql
+_SESSION: Optional[requests.Session] = None
+
+# Lotes de projetos cujos itens são buscados em paralelo
+ISSUES_FETCH_WORKERS = 8
+# Projetos lidos por consulta GraphQL (um alias por projeto, 100 itens cada)
+PROJECTS_PER_QUERY = 5
+
+# Conexões HTTP mantidas abertas (>= ISSUES_FETCH_WORKERS; um único host)
+HTTP_POOL_SIZE = 32
+
+# Abaixo desta cota restante, o limitador passa a espaçar as chamadas até o reset
+RATE_LIMIT_MIN_REMAINING = 100
+# Tentativas ao receber 403/429 (limite secundário) ou erro 5xx
+RATE_LIMIT_RETRIES = 6
+# Backoff exponencial sem retry-after: 1, 2, 4, 8, 16, 32s (+ jitter)
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_MAX_SECONDS = 32
+# Limite secundário sem retry-after: o GitHub pede ao menos 1 minuto
+SECONDARY_LIMIT_MIN_WAIT = 60
 
+# Limitador compartilhado por todas as threads (X-RateLimit-Remaining/Reset)
+_RATE_LIMITER = GHRateLimiter(threshold=RATE_LIMIT_MIN_REMAINING)
 
-def update_projects_data():
-    """Chama o script projects_panels.py para atualizar os arquivos de projetos"""
-    import subprocess
-    import sys
+# Atualizações de campo enviadas por mutation (uma por alias)
+MUTATION_BATCH_SIZE = 25
+# Mutations em paralelo: poucas, pois o GitHub aplica limites secundários a escritas
+MUTATION_WORKERS = 2
+
+def update_projects_data(org: Optional[str] = None, cache_dir: str = 'logs/cache',
+                         force_refresh: bool = False) -> bool:
+    """Atualiza os arquivos de projetos chamando projects_panels.run no mesmo processo
+
+    Se o mesmo processo já gerou o arquivo de info da organização (ex: main.py
+    com --all), os dados estão atuais e a consulta não é repetida.
+    """
+    from scripts.projects_panels import refreshed_info_path, run as projects_panels_run
+    
+    refreshed = refreshed_info_path(org or os.getenv("GITHUB_ORG") or DEFAULT_ORG)
+    if refreshed is not None and refreshed == Path(PROJECTS_INFO_FILE).resolve():
+        print("✅ Dados dos projetos já atualizados nesta execução")
+        return True
     
     print("🔄 Atualizando dados dos projetos...")
     
     try:
-        # Executar o script projects_panels.py
-        result = subprocess.run([
-            sys.executable, 'scripts/projects_panels.py'
-        ], capture_output=True, text=True, cwd=Path.cwd())
-        
-        if result.returncode == 0:
-            print("✅ Dados dos projetos atualizados com sucesso")
-            if result.stdout:
-                print(f"📋 Saída do projects_panels.py: {result.stdout}")
-            return True
-        else:
-            print(f"❌ Erro ao atualizar dados dos projetos: {result.stderr}")
-            if result.stdout:
-                print(f"📋 Saída do projects_panels.py: {result.stdout}")
+        if not projects_panels_run(org=org, cache_dir=cache_dir, force_refresh=force_refresh):
+            print("❌ Erro ao atualizar dados dos projetos")
             return False
+        print("✅ Dados dos projetos atualizados com sucesso")
+        return True
     except Exception as e:
-        print(f"❌ Erro ao executar projects_panels.py: {e}")
+        print(f"❌ Erro ao atualizar dados dos projetos: {e}")
         return False
 
 def _require_env(name: str) -> str:
@@ -107,26 +138,100 @@ def _require_env(name: str) -> str:
         raise RuntimeError(f"Missing required environment variable: {name}")
     return value
 
-def _graphql(token: str, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
-    """Execute GraphQL query against GitHub API."""
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
-    resp = requests.post(
-        GITHUB_GRAPHQL_URL, 
-        json={"query": query, "variables": variables}, 
-        headers=headers
-    )
+def _session() -> requests.Session:
+    """Sessão HTTP persistente: reaproveita a conexão TLS entre chamadas GraphQL."""
+    global _SESSION
+    if _SESSION is None:
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "Connection": "keep-alive",
+        })
+        # Pool dimensionado para as threads de busca: sem descarte de conexões
+        # ("Connection pool is full") quando todas consultam ao mesmo tempo.
+        # Sem retry no adaptador: as novas tentativas ficam só em _graphql_response
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE))
+        # Cota compartilhada entre as threads: cada resposta atualiza o limitador
+        _RATE_LIMITER.attach(session)
+        _SESSION = session
+    return _SESSION
+
+def _backoff_delay(attempt: int) -> float:
+    """Espera exponencial com jitter para a tentativa `attempt` (0, 1, 2...)"""
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+    return delay + random.uniform(0, delay / 2)
+
+def _retry_delay(resp: requests.Response, attempt: int) -> Optional[float]:
+    """Quanto esperar antes de repetir a chamada, ou None se ela não deve ser repetida
+
+    - 403/429 com retry-after: o tempo informado pelo GitHub
+    - 403/429 de limite secundário sem retry-after: ao menos um minuto, com backoff
+    - 5xx: backoff exponencial
+    """
+    status = resp.status_code
+    if status in (403, 429):
+        retry_after = resp.headers.get("retry-after")
+        if retry_after:
+            return int(retry_after) if retry_after.isdigit() else SECONDARY_LIMIT_MIN_WAIT
+        if status == 429 or "secondary rate limit" in resp.text.lower():
+            return max(SECONDARY_LIMIT_MIN_WAIT, _backoff_delay(attempt))
+        return None
+    if status >= 500:
+        return _backoff_delay(attempt)
+    return None
+
+def _graphql_response(token: str, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute GraphQL query and return the full payload (``data`` and ``errors``).
+
+    Única camada de novas tentativas (o adaptador da sessão não repete):
+    limites de taxa, 5xx e falhas de conexão, até RATE_LIMIT_RETRIES vezes.
+    """
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        # O token vai por requisição: ele pode ser renovado durante a execução
+        # Corpo e resposta via fast_json (orjson quando instalado)
+        try:
+            resp = fast_json.post_json(
+                _session(), GITHUB_GRAPHQL_URL,
+                {"query": query, "variables": variables},
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=GRAPHQL_TIMEOUT
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == RATE_LIMIT_RETRIES:
+                raise
+            wait = _backoff_delay(attempt)
+            print(f"⏳ GraphQL falhou ({type(e).__name__}), nova tentativa em {wait:.0f}s "
+                  f"({attempt + 1}/{RATE_LIMIT_RETRIES})...")
+            time.sleep(wait)
+            continue
+        wait = _retry_delay(resp, attempt)
+        if wait is None or attempt == RATE_LIMIT_RETRIES:
+            break
+        print(f"⏳ GraphQL HTTP {resp.status_code}, nova tentativa em {wait:.0f}s "
+              f"({attempt + 1}/{RATE_LIMIT_RETRIES})...")
+        time.sleep(wait)
     if resp.status_code != 200:
         raise RuntimeError(f"GraphQL HTTP {resp.status_code}: {resp.text}")
-    data = resp.json()
+    return fast_json.response_json(resp)
+
+def _graphql(token: str, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute GraphQL query against GitHub API."""
+    data = _graphql_response(token, query, variables)
     if "errors" in data:
         raise RuntimeError(f"GraphQL errors: {json.dumps(data['errors'], ensure_ascii=False)}")
     return data["data"]
 
+def _parse_iso(date_str: str) -> dt.datetime:
+    """Converte um timestamp ISO 8601 do GitHub (sufixo Z) em datetime com fuso."""
+    return dt.datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+
 def _iso_date(date_str: str) -> str:
     """Return YYYY-MM-DD from an ISO datetime string."""
+    # Formato usual do GitHub (2025-08-27T23:59:59Z, UTC): a data é o prefixo
+    if len(date_str) == 20 and date_str[-1] == 'Z':
+        return date_str[:10]
     try:
         # GitHub gives ISO 8601 like 2025-08-27T23:59:59Z
         d = dt.datetime.fromisoformat(date_str.replace("Z", "+00:00"))
@@ -135,7 +240,12 @@ def _iso_date(date_str: str) -> str:
         # If already a date, return as-is
         return date_str[:10]
 
-def load_repos_from_csv(csv_file: str) -> List[Dict[str, Any]]:
+class RepoRef(NamedTuple):
+    """Repositório listado no CSV: só o que o processamento usa"""
+    name: str
+    archived: bool
+
+def load_repos_from_csv(csv_file: str) -> List[RepoRef]:
     """Carrega a lista de repositórios do arquivo CSV"""
     repos = []
     
@@ -146,17 +256,30 @@ def load_repos_from_csv(csv_file: str) -> List[Dict[str, Any]]:
     
     print(f"📋 Carregando repositórios de {csv_file}...")
     
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        # Índices das colunas resolvidos uma vez, a partir do cabeçalho
+        header = next(reader, [])
+        name_i = header.index('name')
+        arch_i = header.index('archived') if 'archived' in header else None
         for row in reader:
-            repos.append({
-                'name': row['name'], 
-                'archived': row.get('archived', 'False') == 'True'
-            })
+            if not row:
+                continue
+            repos.append(RepoRef(row[name_i], arch_i is not None and row[arch_i] == 'True'))
     
     print(f"✅ {len(repos)} repositórios carregados")
     return repos
 
+@functools.lru_cache(maxsize=4)
+def _load_yaml_cached(path: str, mtime_ns: int) -> Any:
+    """YAML interpretado, memoizado por (caminho, mtime): o arquivo é lido uma vez por versão"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+def _load_yaml(path: str) -> Any:
+    """Carrega um YAML reaproveitando a leitura anterior se o arquivo não mudou"""
+    return _load_yaml_cached(path, os.stat(path).st_mtime_ns)
+
 def load_projects_from_yaml(yaml_file: str) -> List[Dict[str, Any]]:
     """Carrega a lista de projetos do arquivo YAML"""
     projects = []
@@ -168,34 +291,41 @@ def load_projects_from_yaml(yaml_file: str) -> List[Dict[str, Any]]:
     print(f"📊 Carregando projetos de {yaml_file}...")
     
     try:
-        with open(yaml_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-            if data and 'projects' in data:
-                projects = data['projects']
-                print(f"✅ {len(projects)} projetos carregados")
-            else:
-                print("⚠️  Nenhum projeto encontrado no arquivo YAML")
+        data = _load_yaml(yaml_file)
+        if data and 'projects' in data:
+            projects = data['projects']
+            print(f"✅ {len(projects)} projetos carregados")
+        else:
+            print("⚠️  Nenhum projeto encontrado no arquivo YAML")
     except yaml.YAMLError as e:
         print(f"❌ Erro ao ler arquivo YAML: {e}")
     
     return projects
 
 
-def select_panels_interactive(projects_list: List[Dict[str, Any]], field_name: str = DEFAULT_FIELD_NAME) -> List[int]:
+def _build_project_field_index(projects: List[Dict[str, Any]]) -> Dict[int, Tuple[Dict[str, Any], FrozenSet[str]]]:
+    """Índice {número: (projeto, nomes de campo normalizados)} para validar seleções por pertinência"""
+    return {
+        project['number']: (project, frozenset(_fields_lc(project)))
+        for project in projects if 'number' in project
+    }
+
+
+def select_panels_interactive(projects_list: List[Dict[str, Any]], field_name: str = DEFAULT_FIELD_NAME,
+                              verbose: bool = False) -> List[int]:
     """Interface interativa para seleção de painéis"""
     if not projects_list:
         print("❌ Nenhum projeto disponível para seleção")
         return []
     
-    # Criar dicionário para busca rápida por número do projeto
-    projects_by_number = {project['number']: project for project in projects_list}
-    available_numbers = sorted(projects_by_number.keys())
+    index = _build_project_field_index(projects_list)
+    available_numbers = sorted(index)
     
     print("\n📋 Projetos disponíveis:")
     print("=" * 60)
     
     for project_number in available_numbers:
-        project = projects_by_number[project_number]
+        project = index[project_number][0]
         print(f"num. prj: {project_number}")
         print(f"    name: {project['name']}")
         print(f"      ID: {project['id']}")
@@ -207,22 +337,18 @@ def select_panels_interactive(projects_list: List[Dict[str, Any]], field_name: s
         try:
             selection = input("Digite o(s) número(s) do(s) projeto(s) que deseja sincronizar (separados por vírgula) ou 'all' para todos: ").strip()
             
+            target_lc = field_name.strip().lower()
             if selection.lower() == 'all':
-                selected_projects = []
-                for project_number in available_numbers:
-                    project = projects_by_number[project_number]
-                    # Verificar se o projeto possui o campo especificado
-                    has_field = False
-                    for field in project.get('fields', []):
-                        if field.get('name', '').strip().lower() == field_name.strip().lower():
-                            has_field = True
-                            break
-                    
-                    if has_field:
-                        selected_projects.append(project_number)
-                        print(f"  ✅ Projeto '{project['name']}' (#{project_number}) possui campo '{field_name}'")
-                    else:
-                        print(f"  ❌ Projeto '{project['name']}' (#{project_number}) NÃO possui campo '{field_name}'")
+                selected_projects = [num for num in available_numbers if target_lc in index[num][1]]
+                if verbose:
+                    for num in available_numbers:
+                        project, fields = index[num]
+                        if target_lc in fields:
+                            print(f"  ✅ Projeto '{project['name']}' (#{num}) possui campo '{field_name}'")
+                        else:
+                            print(f"  ❌ Projeto '{project['name']}' (#{num}) NÃO possui campo '{field_name}'")
+                elif len(selected_projects) < len(available_numbers):
+                    print(f"  ⏭️  {len(available_numbers) - len(selected_projects)} projetos sem o campo '{field_name}'")
                 
                 if not selected_projects:
                     print(f"\n❌ Nenhum dos projetos selecionados possui o campo '{field_name}'")
@@ -240,18 +366,11 @@ def select_panels_interactive(projects_list: List[Dict[str, Any]], field_name: s
             selected_project_names = []
             
             for num in numbers:
-                if num in projects_by_number:
-                    project = projects_by_number[num]
+                if num in index:
+                    project, fields = index[num]
                     project_name = project['name']
                     
-                    # Verificar se o projeto possui o campo especificado
-                    has_field = False
-                    for field in project.get('fields', []):
-                        if field.get('name', '').strip().lower() == field_name.strip().lower():
-                            has_field = True
-                            break
-                    
-                    if has_field:
+                    if target_lc in fields:
                         valid_numbers.append(num)
                         selected_project_names.append(project_name)
                     else:
@@ -289,7 +408,8 @@ def filter_projects_by_numbers(projects_list: List[Dict[str, Any]], target_numbe
     return filtered_projects
 
 
-def load_projects_with_fields_from_yaml(yaml_file: str, target_numbers: List[int], field_name: str = DEFAULT_FIELD_NAME) -> List[Dict[str, Any]]:
+def load_projects_with_fields_from_yaml(yaml_file: str, target_numbers: List[int], field_name: str = DEFAULT_FIELD_NAME,
+                                        verbose: bool = False) -> List[Dict[str, Any]]:
     """Carrega projetos completos do arquivo YAML e filtra pelos números e campo especificados"""
     projects = []
     
@@ -300,313 +420,469 @@ def load_projects_with_fields_from_yaml(yaml_file: str, target_numbers: List[int
     print(f"📊 Carregando projetos completos de {yaml_file}...")
     
     try:
-        with open(yaml_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-            if data and 'projects' in data:
-                all_projects = data['projects']
-                print(f"🔍 Total de projetos no arquivo: {len(all_projects)}")
-                print(f"🎯 Números de projeto solicitados: {target_numbers}")
-                print(f"🔍 Campo procurado: '{field_name}'")
-                
-                # Filtrar pelos números especificados
-                for project in all_projects:
-                    if project.get('number') in target_numbers:
-                        print(f"🔍 Analisando projeto: {project['name']} (#{project['number']})")
-                        print(f"   Campos disponíveis: {[f.get('name', 'N/A') for f in project.get('fields', [])]}")
-                        
-                        # Verificar se possui o campo especificado
-                        has_field = False
-                        for field in project.get('fields', []):
-                            field_name_actual = field.get('name', '').strip()
-                            if field_name_actual.lower() == field_name.strip().lower():
-                                has_field = True
-                                print(f"   ✅ Campo encontrado: '{field_name_actual}' (exato)")
-                                break
-                        
-                        if has_field:
-                            projects.append(project)
-                            print(f"  ✅ Projeto '{project['name']}' (#{project['number']}) possui campo '{field_name}'")
-                        else:
-                            print(f"  ⏭️  Projeto '{project['name']}' (#{project['number']}) não possui campo '{field_name}'")
+        data = _load_yaml(yaml_file)
+        if data and 'projects' in data:
+            all_projects = data['projects']
+            print(f"🔍 Total de projetos no arquivo: {len(all_projects)}")
+            print(f"🎯 Números de projeto solicitados: {target_numbers}")
+            print(f"🔍 Campo procurado: '{field_name}'")
+            
+            # Filtrar pelos números especificados (na ordem pedida, sem repetições)
+            target_lc = field_name.strip().lower()
+            index = _build_project_field_index(all_projects)
+            for num in dict.fromkeys(target_numbers):
+                if num not in index:
+                    continue
+                project, fields = index[num]
+                if verbose:
+                    print(f"🔍 Analisando projeto: {project['name']} (#{num})")
+                    print(f"   Campos disponíveis: {[f.get('name', 'N/A') for f in project.get('fields', [])]}")
                 
-                print(f"✅ {len(projects)} projetos carregados e filtrados")
-            else:
-                print("⚠️  Nenhum projeto encontrado no arquivo YAML")
+                if target_lc in fields:
+                    projects.append(project)
+                    if verbose:
+                        print(f"  ✅ Projeto '{project['name']}' (#{num}) possui campo '{field_name}'")
+                else:
+                    print(f"  ⏭️  Projeto '{project['name']}' (#{num}) não possui campo '{field_name}'")
+            
+            print(f"✅ {len(projects)} projetos carregados e filtrados")
+        else:
+            print("⚠️  Nenhum projeto encontrado no arquivo YAML")
     except yaml.YAMLError as e:
         print(f"❌ Erro ao ler arquivo YAML: {e}")
     
     return projects
 
+def _fields_lc(project: Dict[str, Any]) -> Dict[str, str]:
+    """Índice {nome normalizado: ID} dos campos do projeto
+
+    Não é guardado no próprio projeto: o dict vem do YAML em cache e é
+    compartilhado entre chamadas.
+    """
+    return {f.get('name', '').strip().lower(): f.get('id') for f in project.get('fields', [])}
+
 def get_project_field_id(project: Dict[str, Any], field_name: str = DEFAULT_FIELD_NAME) -> Optional[str]:
     """Obtém o ID do campo especificado no projeto"""
-    for field in project.get('fields', []):
-        if field.get('name', '').strip().lower() == field_name.strip().lower():
-            return field['id']
-    return None
+    return _fields_lc(project).get(field_name.strip().lower())
 
-def get_issues_from_repo(token: str, org: str, repo_name: str, since_iso: Optional[str] = None,
-                        cache_manager: Optional[CacheManager] = None,
-                        force_refresh: bool = False) -> List[Dict[str, Any]]:
-    """Obtém issues de um repositório com cache inteligente."""
-    if cache_manager is None:
-        cache_manager = CacheManager()
+# Valores de campo usados pelas regras: Status (seleção única) e o campo de data.
+# Os demais tipos de valor chegam como objetos vazios. O nome do campo não é
+# pedido: cada valor vem de um fieldValueByName e fetch_projects_items o preenche.
+FIELD_VALUE_FRAGMENT = """
+fragment FieldValueFields on ProjectV2ItemFieldValue {
+  ... on ProjectV2ItemFieldSingleSelectValue {
+    name
+  }
+  ... on ProjectV2ItemFieldDateValue {
+    date
+  }
+}
+"""
+
+# Issue vinculado a um item de projeto (itens que não são issues vêm vazios)
+ITEM_ISSUE_FRAGMENT = """
+fragment ItemIssueFields on Issue {
+  id
+  number
+  title @include(if: $withTitle)
+  state
+  closedAt
+  updatedAt
+  repository {
+    name
+  }
+}
+"""
+
+# Uma página de itens de um projeto, sob o alias p{n}: cada projeto tem seu
+# cursor e os nomes dos seus campos de Status e de data ($c{n}, $s{n}, $d{n})
+PROJECT_ITEMS_ALIAS = """
+  p{n}: node(id: $p{n}) {{
+    ... on ProjectV2 {{
+      items(first: 100, after: $c{n}) {{
+        nodes {{
+          id
+          updatedAt
+          status: fieldValueByName(name: $s{n}) {{
+            ...FieldValueFields
+          }}
+          date: fieldValueByName(name: $d{n}) {{
+            ...FieldValueFields
+          }}
+          content {{
+            ...ItemIssueFields
+          }}
+        }}
+        pageInfo {{
+          hasNextPage
+          endCursor
+        }}
+      }}
+    }}
+  }}"""
+
+@functools.lru_cache(maxsize=None)
+def project_items_query(count: int) -> str:
+    """Consulta com `count` aliases de PROJECT_ITEMS_ALIAS (montada uma vez por tamanho)"""
+    params = ["$withTitle: Boolean = false"]
+    for n in range(count):
+        params.append(f"$p{n}: ID!, $c{n}: String, $s{n}: String!, $d{n}: String!")
+    aliases = "".join(PROJECT_ITEMS_ALIAS.format(n=n) for n in range(count))
+    return (f"query({', '.join(params)}) {{{aliases}\n}}\n"
+            + FIELD_VALUE_FRAGMENT + ITEM_ISSUE_FRAGMENT)
+
+def _item_field_names(project: Dict[str, Any], field_name: str) -> Tuple[str, str]:
+    """Nomes exatos dos campos de Status e de data no projeto (fieldValueByName compara o nome exato)"""
+    field_names = {f.get('name', '').strip().lower(): f['name'] for f in project.get('fields', [])}
+    return (field_names.get('status', 'Status'),
+            field_names.get(field_name.strip().lower(), field_name))
+
+def _project_items_cache_key(org: str, project: Dict[str, Any], field_name: str,
+                             with_title: bool) -> str:
+    """Chave no cache 'issues' dos itens de um projeto (com e sem título são entradas distintas)"""
+    return f"{org}_project_{project.get('number')}_{field_name}_items{'_titles' if with_title else ''}"
+
+def invalidate_project_items(cache_manager: CacheManager, org: str, project: Dict[str, Any],
+                             field_name: str = DEFAULT_FIELD_NAME) -> None:
+    """Descarta os itens em cache de um projeto (ex: após alterar seus campos)"""
+    for with_title in (False, True):
+        cache_manager.invalidate('issues', _project_items_cache_key(org, project, field_name, with_title))
+
+def fetch_projects_items(token: str, projects: List[Dict[str, Any]],
+                         field_name: str = DEFAULT_FIELD_NAME,
+                         with_title: bool = False) -> List[List[Dict[str, Any]]]:
+    """Lê os itens de vários projetos, uma página de cada projeto por requisição
+
+    Cada projeto ocupa um alias (p0, p1, ...) da mesma consulta; a cada
+    rodada seguem só os projetos que ainda têm páginas. Retorna as listas
+    de itens na ordem de `projects`.
+    """
+    results: List[List[Dict[str, Any]]] = [[] for _ in projects]
+    names = [_item_field_names(project, field_name) for project in projects]
+    cursors: Dict[int, Optional[str]] = dict.fromkeys(range(len(projects)))
     
-    # Chave do cache baseada em parâmetros
-    cache_key = f"{org}_{repo_name}_{since_iso or 'all'}"
+    while cursors:
+        pending = list(cursors)
+        variables: Dict[str, Any] = {"withTitle": with_title}
+        for n, index in enumerate(pending):
+            variables[f"p{n}"] = projects[index]['id']
+            variables[f"c{n}"] = cursors[index]
+            variables[f"s{n}"], variables[f"d{n}"] = names[index]
+        data = _graphql(token, project_items_query(len(pending)), variables)
+        
+        for n, index in enumerate(pending):
+            items = (data.get(f"p{n}") or {}).get("items") or {}
+            status_name, date_name = names[index]
+            for item in items.get("nodes", []):
+                if not (item.get("content") or {}).get("id"):
+                    continue
+                values = [(status_name, item.pop("status", None)), (date_name, item.pop("date", None))]
+                item["fieldValues"] = {"nodes": [
+                    {"field": {"name": name}, **value} for name, value in values if value
+                ]}
+                results[index].append(item)
+            page_info = items.get("pageInfo", {})
+            if page_info.get("hasNextPage"):
+                cursors[index] = page_info.get("endCursor")
+            else:
+                del cursors[index]
     
-    # Tentar recuperar do cache
-    if not force_refresh:
-        cached_issues = cache_manager.get('issues', cache_key)
-        if cached_issues:
-            print(f"📦 Usando issues em cache para {repo_name}")
-            return cached_issues.get('issues', [])
-    
-    print(f"🔄 Buscando issues do repositório {repo_name}...")
-    # Quando since_iso é informado, aplicamos filterBy.since e ordenamos por UPDATED_AT DESC
-    query = """
-    query($owner: String!, $repo: String!, $cursor: String, $since: DateTime) {
-      repository(owner: $owner, name: $repo) {
-        issues(
-          first: 100,
-          after: $cursor,
-          states: [OPEN, CLOSED],
-          filterBy: { since: $since },
-          orderBy: { field: UPDATED_AT, direction: DESC }
-        ) {
-          nodes {
-            id
-            number
-            title
-            state
-            closedAt
-            updatedAt
-            projectItems(first: 50) {
-              nodes {
-                id
-                project {
-                  id
-                  number
-                  title
-                }
-                fieldValues(first: 50) {
-                  nodes {
-                    ... on ProjectV2ItemFieldSingleSelectValue {
-                      field {
-                        ... on ProjectV2FieldCommon {
-                          name
-                        }
-                      }
-                      name
-                    }
-                    ... on ProjectV2ItemFieldDateValue {
-                      field {
-                        ... on ProjectV2FieldCommon {
-                          name
-                        }
-                      }
-                      date
-                    }
-                  }
-                }
-              }
-            }
-          }
-          pageInfo {
-            hasNextPage
-            endCursor
-          }
-        }
-      }
-    }
+    return results
+
+def get_projects_items(token: str, projects: List[Dict[str, Any]], org: str,
+                       cache_manager: Optional[CacheManager] = None,
+                       force_refresh: bool = False, field_name: str = DEFAULT_FIELD_NAME,
+                       with_title: bool = False) -> List[List[Dict[str, Any]]]:
+    """Obtém os itens dos projetos com o status, a data e o issue vinculado
+
+    Uma consulta paginada pelos projetos alvo substitui a leitura de todas as
+    issues de todos os repositórios. Itens que não são issues (drafts, PRs)
+    são descartados. Só os valores de Status e do campo de data são pedidos
+    (fieldValueByName), já no formato de `fieldValues`.
+
+    Projetos sem itens em cache são lidos em lotes de PROJECTS_PER_QUERY
+    (um alias por projeto, ver fetch_projects_items), com os lotes em paralelo.
     """
+    if cache_manager is None:
+        cache_manager = CacheManager()
     
-    all_issues = []
-    cursor = None
+    results: List[Optional[List[Dict[str, Any]]]] = [None] * len(projects)
+    if not force_refresh:
+        for index, project in enumerate(projects):
+            cached_items = cache_manager.get(
+                'issues', _project_items_cache_key(org, project, field_name, with_title))
+            if cached_items:
+                print(f"📦 Usando itens em cache do projeto #{project.get('number')}")
+                results[index] = cached_items.get('items', [])
     
-    while True:
-        variables = {"owner": org, "repo": repo_name, "cursor": cursor, "since": since_iso}
-        data = _graphql(token, query, variables)
-        
-        repository = data.get("repository")
-        if not repository:
-            break
-            
-        issues = repository.get("issues", {}).get("nodes", [])
-        all_issues.extend(issues)
-        
-        page_info = repository.get("issues", {}).get("pageInfo", {})
-        if not page_info.get("hasNextPage"):
-            break
-            
-        cursor = page_info.get("endCursor")
-    
-    # Armazenar no cache
-    cache_data = {
-        'issues': all_issues,
-        'cached_at': dt.datetime.now().isoformat(),
-        'repo': repo_name,
-        'org': org,
-        'since': since_iso,
-        'count': len(all_issues)
-    }
-    cache_manager.set('issues', cache_data, cache_key)
+    missing = [index for index, items in enumerate(results) if items is None]
+    if missing:
+        numbers = ', '.join(f"#{projects[index].get('number')}" for index in missing)
+        print(f"🔄 Buscando itens dos projetos {numbers}...")
+    batches = [missing[start:start + PROJECTS_PER_QUERY]
+               for start in range(0, len(missing), PROJECTS_PER_QUERY)]
+    with ThreadPoolExecutor(max_workers=max(1, min(ISSUES_FETCH_WORKERS, len(batches)))) as executor:
+        fetched = executor.map(
+            lambda batch: fetch_projects_items(token, [projects[index] for index in batch],
+                                               field_name, with_title),
+            batches
+        )
+        for batch, batch_items in zip(batches, fetched):
+            for index, items in zip(batch, batch_items):
+                project = projects[index]
+                results[index] = items
+                cache_manager.set('issues', {
+                    'items': items,
+                    'cached_at': dt.datetime.now().isoformat(),
+                    'org': org,
+                    'project': project.get('number'),
+                    'count': len(items)
+                }, _project_items_cache_key(org, project, field_name, with_title))
     
-    return all_issues
+    return results
+
+def issues_from_project_items(projects_items: List[tuple[Dict[str, Any], List[Dict[str, Any]]]],
+                              since_iso: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Converte itens de projetos em issues no formato das consultas de issues
+
+    Cada issue reúne em `projectItems` os seus itens nos projetos lidos. Com
+    `since_iso`, só entram itens cujo issue ou item mudou desde então.
+    """
+    issues: Dict[str, Dict[str, Any]] = {}
+    since = _parse_iso(since_iso) if since_iso else None
+    for project, items in projects_items:
+        project_ref = {
+            'id': project['id'],
+            'number': project.get('number'),
+            'title': project.get('title') or project.get('name', ''),
+        }
+        for item in items:
+            content = item['content']
+            if since and not any(
+                stamp and _parse_iso(stamp) >= since
+                for stamp in (content.get('updatedAt'), item.get('updatedAt'))
+            ):
+                continue
+            issue = issues.get(content['id'])
+            if issue is None:
+                issue = issues[content['id']] = dict(content, projectItems={'nodes': []})
+            # Mudanças de status atualizam só o item: o updatedAt mais recente
+            # entra no hash de estado para que o issue seja reprocessado
+            if (item.get('updatedAt') or '') > (issue.get('updatedAt') or ''):
+                issue['updatedAt'] = item['updatedAt']
+            issue['projectItems']['nodes'].append({
+                'id': item['id'],
+                'project': project_ref,
+                'fieldValues': item.get('fieldValues', {}),
+            })
+    return list(issues.values())
+
+def _values_lc(project_item: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Índice {nome do campo normalizado: valor} do item
+
+    Não é guardado no item: o item entra no hash de estado do issue
+    (get_issue_hash) e uma chave extra faria o hash nunca coincidir.
+    """
+    values_lc: Dict[str, Dict[str, Any]] = {}
+    for field_value in project_item.get('fieldValues', {}).get('nodes', []):
+        name = (field_value.get('field') or {}).get('name', '').strip().lower()
+        values_lc.setdefault(name, field_value)
+    return values_lc
 
 def get_project_item_status_and_date(project_item: Dict[str, Any], field_name: str = DEFAULT_FIELD_NAME) -> tuple[Optional[str], Optional[str]]:
     """Obtém o status e a data do campo especificado do item do projeto"""
-    status = None
-    date_value = None
-    
-    for field_value in project_item.get('fieldValues', {}).get('nodes', []):
-        field = field_value.get('field', {})
-        field_name_actual = field.get('name', '')
-        
-        if field_name_actual.strip().lower() == 'status':
-            status = field_value.get('name')
-        elif field_name_actual.strip().lower() == field_name.strip().lower():
-            date_value = field_value.get('date')
-    
+    values = _values_lc(project_item)
+    status = values.get('status', {}).get('name')
+    date_value = values.get(field_name.strip().lower(), {}).get('date')
     return status, date_value
 
-def clear_date_field(token: str, project_id: str, item_id: str, field_id: str) -> tuple[bool, str]:
-    """Limpa o campo de data (define como null)"""
-    mutation = """
-    mutation($project: ID!, $item: ID!, $field: ID!) {
-      updateProjectV2ItemFieldValue(
-        input: {
-          projectId: $project,
-          itemId: $item,
-          fieldId: $field,
-          value: { date: null }
-        }
-      ) { clientMutationId }
-    }
+@dataclass(frozen=True)
+class Op:
+    """Alteração planejada no campo de data de um item de projeto"""
+    kind: Literal['set', 'clear']
+    project_id: str
+    item_id: str
+    field_id: str
+    date: Optional[str] = None
+    label: str = ''
+
+def build_bulk_mutation(ops: List[Op]) -> tuple[str, Dict[str, Any]]:
+    """Monta uma única mutation com um alias (m0, m1, ...) por atualização de campo
+
+    Projeto, campo e data repetidos no lote viram uma só variável ($p0, $f0,
+    $v0...), compartilhada pelos aliases; só o item ($iN) é individual.
     """
+    shared: Dict[tuple, str] = {}
+    counts: Dict[str, int] = {}
+    params = []
+    fields = []
+    variables: Dict[str, Any] = {}
     
-    try:
-        _graphql(token, mutation, {"project": project_id, "item": item_id, "field": field_id})
-        return True, ""
-    except Exception as e:
-        error_msg = str(e)
-        if "archived and cannot be updated" in error_msg:
-            return False, "archived"
-        else:
-            print(f"      ❌ Erro ao limpar campo: {e}")
-            return False, "error"
-
-def set_date_field(token: str, project_id: str, item_id: str, field_id: str, date_value: str) -> tuple[bool, str]:
-    """Define o campo de data com o valor especificado"""
-    mutation = """
-    mutation($project: ID!, $item: ID!, $field: ID!, $value: Date!) {
-      updateProjectV2ItemFieldValue(
-        input: {
-          projectId: $project,
-          itemId: $item,
-          fieldId: $field,
-          value: { date: $value }
-        }
-      ) { clientMutationId }
-    }
-    """
+    def var(prefix: str, value: Any, gql_type: str) -> str:
+        name = shared.get((prefix, value))
+        if name is None:
+            name = shared[(prefix, value)] = f"{prefix}{counts.get(prefix, 0)}"
+            counts[prefix] = counts.get(prefix, 0) + 1
+            params.append(f"${name}: {gql_type}")
+            variables[name] = value
+        return name
     
+    for n, op in enumerate(ops):
+        project_var = var('p', op.project_id, 'ID!')
+        field_var = var('f', op.field_id, 'ID!')
+        params.append(f"$i{n}: ID!")
+        variables[f"i{n}"] = op.item_id
+        if op.kind == 'set':
+            value = f"{{ date: ${var('v', op.date, 'Date!')} }}"
+        else:
+            value = "{ date: null }"
+        fields.append(
+            f"m{n}: updateProjectV2ItemFieldValue(input: {{ projectId: ${project_var}, itemId: $i{n}, "
+            f"fieldId: ${field_var}, value: {value} }}) {{ clientMutationId }}"
+        )
+    query = f"mutation({', '.join(params)}) {{\n  " + "\n  ".join(fields) + "\n}"
+    return query, variables
+
+def _apply_batch(token: str, batch: List[Op], field_name: str) -> Dict[str, int]:
+    """Envia um lote de alterações em uma mutation e conta os resultados por alias"""
+    changes = {"cleared": 0, "set": 0, "errors": 0, "archived_skipped": 0}
+    query, variables = build_bulk_mutation(batch)
     try:
-        _graphql(token, mutation, {
-            "project": project_id, 
-            "item": item_id, 
-            "field": field_id, 
-            "value": date_value
-        })
-        return True, ""
+        payload = _graphql_response(token, query, variables)
     except Exception as e:
-        error_msg = str(e)
-        if "archived and cannot be updated" in error_msg:
-            return False, "archived"
+        logger.error("      Erro ao atualizar %d campos: %s", len(batch), e)
+        changes["errors"] += len(batch)
+        return changes
+    
+    errors_by_alias: Dict[str, str] = {}
+    for error in payload.get("errors") or []:
+        path = error.get("path") or []
+        if path:
+            errors_by_alias[path[0]] = error.get("message", "")
+    
+    for n, op in enumerate(batch):
+        error_msg = errors_by_alias.get(f"m{n}")
+        if error_msg is None and not payload.get("data"):
+            error_msg = json.dumps(payload.get("errors"), ensure_ascii=False)
+        if error_msg is None:
+            if op.kind == 'set':
+                changes["set"] += 1
+                logger.info("      %s: campo '%s' definido para %s", op.label, field_name, op.date)
+            else:
+                changes["cleared"] += 1
+                logger.info("      %s: campo '%s' limpo com sucesso", op.label, field_name)
+        elif "archived and cannot be updated" in error_msg:
+            logger.info("      %s: item arquivado no projeto - ignorando atualização", op.label)
+            changes["archived_skipped"] += 1
         else:
-            print(f"      ❌ Erro ao definir campo: {e}")
-            return False, "error"
+            logger.error("      %s: erro ao atualizar campo: %s", op.label, error_msg)
+            changes["errors"] += 1
+    return changes
+
+def apply_changes(token: str, ops: List[Op], field_name: str = DEFAULT_FIELD_NAME,
+                  batch_size: int = MUTATION_BATCH_SIZE) -> Dict[str, int]:
+    """Aplica as alterações planejadas em lotes de batch_size por requisição
 
-def process_issue_for_projects(token: str, issue: Dict[str, Any], target_projects: List[Dict[str, Any]], 
-                              field_name: str = DEFAULT_FIELD_NAME) -> Dict[str, int]:
-    """Processa um issue para todos os projetos alvo"""
+    Os lotes são independentes e seguem em paralelo (até MUTATION_WORKERS).
+    Os erros são lidos por alias, de modo que uma atualização recusada (ex:
+    item arquivado) não invalida as demais do mesmo lote.
+    """
     changes = {"cleared": 0, "set": 0, "errors": 0, "archived_skipped": 0}
+    batches = [ops[start:start + batch_size] for start in range(0, len(ops), batch_size)]
+    if not batches:
+        return changes
+    with ThreadPoolExecutor(max_workers=min(MUTATION_WORKERS, len(batches))) as executor:
+        for batch_changes in executor.map(lambda batch: _apply_batch(token, batch, field_name), batches):
+            for key in changes:
+                changes[key] += batch_changes[key]
+    return changes
+
+def plan_issue_changes(issue: Dict[str, Any], target_by_id: Dict[str, Dict[str, Any]],
+                       field_by_project: Dict[str, Optional[str]],
+                       field_name: str = DEFAULT_FIELD_NAME) -> List[Op]:
+    """Aplica as regras de negócio a um issue e retorna as alterações necessárias (sem I/O)
+
+    `target_by_id` e `field_by_project` indexam os projetos alvo e o ID do
+    campo de data pelo ID do projeto (montados uma vez em run).
+    """
+    ops: List[Op] = []
     
     issue_number = issue.get('number')
     issue_title = issue.get('title', '')
     issue_state = issue.get('state')
     issue_closed_at = issue.get('closedAt')
     
-    print(f"  🔍 Processando issue #{issue_number}: {issue_title[:50]}...")
+    # Uma passada achata os itens dos projetos alvo em linhas
+    # (item, projeto, status normalizado, data atual); os demais não geram alteração
+    rows = []
+    for item in issue.get('projectItems', {}).get('nodes') or []:
+        project = item.get('project') or {}
+        if project.get('id') in target_by_id:
+            status, current_date = get_project_item_status_and_date(item, field_name)
+            rows.append((item, project, status.lower() if status else None, current_date))
+    if not rows:
+        return ops
+    
+    # Issue aberto sem data preenchida: nenhuma regra gera alteração
+    if issue_state == 'OPEN' and not any(row[3] for row in rows):
+        return ops
+    
+    # Data de fechamento convertida uma vez, para todos os projetos do issue
+    closed_date = _iso_date(issue_closed_at) if issue_closed_at else None
+    
+    # Formatação %-style: sem --verbose a mensagem nem chega a ser montada
+    if issue_title:
+        logger.debug("  Processando issue #%s: %.50s...", issue_number, issue_title)
+    else:
+        logger.debug("  Processando issue #%s...", issue_number)
     
-    # Para cada item do projeto associado ao issue
-    for project_item in issue.get('projectItems', {}).get('nodes', []):
-        project = project_item.get('project', {})
+    for project_item, project, status, current_date in rows:
         project_id = project.get('id')
-        project_number = project.get('number')
         project_title = project.get('title', '')
         
-        # Verificar se este projeto está na lista de projetos alvo
-        target_project = None
-        for tp in target_projects:
-            if tp.get('id') == project_id:
-                target_project = tp
-                break
-        
-        if not target_project:
-            continue
-        
-        print(f"    📋 Projeto: {project_title} (#{project_number})")
+        logger.debug("    Projeto: %s (#%s)", project_title, project.get('number'))
         
         # Obter ID do campo "Data Fim"
-        field_id = get_project_field_id(target_project, field_name)
+        field_id = field_by_project[project_id]
         if not field_id:
-            print(f"      ⚠️  Campo '{field_name}' não encontrado no projeto")
+            logger.warning("      Campo '%s' não encontrado no projeto %s", field_name, project_title)
             continue
         
-        # Obter status e valor atual do campo
-        status, current_date = get_project_item_status_and_date(project_item, field_name)
-        
-        print(f"      📊 Status: {status}, Data atual: {current_date or 'vazio'}")
+        logger.debug("      Status: %s, Data atual: %s", status, current_date or 'vazio')
         
         # Aplicar regras de negócio
-        if status and status.lower() != 'done':
+        if status and status != 'done':
             # Status != "Done": campo deve estar vazio
             if current_date:
-                print(f"      🗑️  Limpando campo '{field_name}' (status != Done)")
-                success, error_type = clear_date_field(token, project_id, project_item['id'], field_id)
-                if success:
-                    changes["cleared"] += 1
-                    print(f"      ✅ Campo '{field_name}' limpo com sucesso")
-                elif error_type == "archived":
-                    print(f"      ⏭️  Item arquivado no projeto - ignorando atualização")
-                    changes["archived_skipped"] += 1
-                else:
-                    changes["errors"] += 1
+                logger.debug("      Limpando campo '%s' (status != Done)", field_name)
+                ops.append(Op('clear', project_id, project_item['id'], field_id,
+                              label=f"#{issue_number} {project_title}"))
             else:
-                print(f"      ✅ Campo '{field_name}' já está vazio")
+                logger.debug("      Campo '%s' já está vazio", field_name)
         
-        elif status and status.lower() == 'done':
+        elif status == 'done':
             # Status == "Done": campo deve ter data de fechamento
-            if not current_date and issue_closed_at and issue_state == 'CLOSED':
-                date_value = _iso_date(issue_closed_at)
-                print(f"      📅 Definindo campo '{field_name}' para {date_value} (status = Done, issue fechado)")
-                success, error_type = set_date_field(token, project_id, project_item['id'], field_id, date_value)
-                if success:
-                    changes["set"] += 1
-                    print(f"      ✅ Campo '{field_name}' definido para {date_value}")
-                elif error_type == "archived":
-                    print(f"      ⏭️  Item arquivado no projeto - ignorando atualização")
-                    changes["archived_skipped"] += 1
-                else:
-                    changes["errors"] += 1
+            if not current_date and closed_date and issue_state == 'CLOSED':
+                logger.debug("      Definindo campo '%s' para %s (status = Done, issue fechado)", field_name, closed_date)
+                ops.append(Op('set', project_id, project_item['id'], field_id, closed_date,
+                              label=f"#{issue_number} {project_title}"))
             elif current_date:
-                print(f"      ✅ Campo '{field_name}' já está preenchido: {current_date}")
+                logger.debug("      Campo '%s' já está preenchido: %s", field_name, current_date)
             elif issue_state != 'CLOSED':
-                print(f"      ⚠️  Issue com status 'Done' mas não está fechado (state: {issue_state})")
+                logger.debug("      Issue com status 'Done' mas não está fechado (state: %s)", issue_state)
             else:
-                print(f"      ⚠️  Issue fechado mas sem data de fechamento")
+                logger.debug("      Issue fechado mas sem data de fechamento")
     
-    return changes
+    return ops
+
+def plan_changes(issues: List[Dict[str, Any]], target_by_id: Dict[str, Dict[str, Any]],
+                 field_by_project: Dict[str, Optional[str]],
+                 field_name: str = DEFAULT_FIELD_NAME) -> List[Op]:
+    """Planeja as alterações de todos os issues (fase 1, só CPU); apply_changes é a fase 2"""
+    ops: List[Op] = []
+    for issue in issues:
+        ops.extend(plan_issue_changes(issue, target_by_id, field_by_project, field_name))
+    return ops
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -661,27 +937,33 @@ Ordem de prioridade para projeto padrão:
     parser.add_argument('--cache-stats', action='store_true',
                        help='Show cache statistics')
     
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Lista as alterações planejadas sem aplicá-las')
+    
     parser.add_argument('--verbose', '-v', 
                        action='store_true',
                        help='Modo verboso com mais detalhes')
     
     return parser.parse_args()
 
-def main():
-    """Função principal"""
-    args = parse_arguments()
-    
+def run(*, org: Optional[str] = None, panel: bool = False, projects: Optional[str] = None,
+        field: str = DEFAULT_FIELD_NAME, repos_file: str = DEFAULT_REPOS_FILE,
+        projects_panels_list: str = DEFAULT_PROJECTS_LIST, days: int = 7,
+        all_issues: bool = False, force_refresh: bool = False,
+        cache_dir: str = 'logs/cache', skip_cache: bool = False,
+        cache_stats: bool = False, verbose: bool = False, dry_run: bool = False) -> None:
+    """Gerencia o campo de data nos projetos (ponto de entrada para chamadas diretas)"""
     # Inicializar cache manager
-    cache_manager = CacheManager(cache_dir=args.cache_dir)
+    cache_manager = CacheManager(cache_dir=cache_dir)
     issue_state = IssueProcessingState(cache_manager)
     
     # Mostrar estatísticas de cache se solicitado
-    if args.cache_stats:
+    if cache_stats:
         log_cache_stats(cache_manager)
         return
     
     # Carregar variáveis de ambiente
-    load_dotenv()
+    load_env_file()
     
     # Obter token do GitHub via App
     try:
@@ -693,21 +975,22 @@ def main():
     print(f"🔑 Usando token (App): {github_token[:8]}...")
     
     # Atualizar dados dos projetos primeiro
-    if not update_projects_data():
+    if not update_projects_data(org, cache_dir, force_refresh):
         print("⚠️  Continuando com dados existentes...")
     
     # Aplicar hierarquia de priorização (argumentos > env vars > padrões)
-    org = args.org or os.getenv("GITHUB_ORG") or DEFAULT_ORG
+    org_arg = org
+    org = org or os.getenv("GITHUB_ORG") or DEFAULT_ORG
     
     # Mostrar configurações aplicadas
     print(f"\n🔧 Configurações aplicadas:")
     print(f"   Organização: {org}")
-    print(f"   Arquivo de repositórios: {args.repos_file}")
-    print(f"   Arquivo de projetos: {args.projects_panels_list}")
-    print(f"   Campo: {args.field}")
+    print(f"   Arquivo de repositórios: {repos_file}")
+    print(f"   Arquivo de projetos: {projects_panels_list}")
+    print(f"   Campo: {field}")
     
     # Mostrar qual valor foi aplicado e de onde veio
-    if args.org:
+    if org_arg:
         org_source = "argumento --org"
     elif os.getenv("GITHUB_ORG"):
         org_source = f"arquivo .env (GITHUB_ORG={os.getenv('GITHUB_ORG')})"
@@ -716,18 +999,18 @@ def main():
     
     print(f"   Fonte da organização: {org_source}")
     
-    if args.verbose:
+    if verbose:
         print(f"   Modo verboso ativado")
     
     try:
         # Carregar repositórios
-        repos = load_repos_from_csv(args.repos_file)
+        repos = load_repos_from_csv(repos_file)
         if not repos:
             print("❌ Nenhum repositório encontrado para processar")
             return
         
         # Carregar lista de projetos (usar projects-panels-info.yml que tem os campos completos)
-        projects_list = load_projects_from_yaml('config/projects-panels-info.yml')
+        projects_list = load_projects_from_yaml(PROJECTS_INFO_FILE)
         if not projects_list:
             print("❌ Nenhum projeto encontrado na lista")
             return
@@ -735,16 +1018,16 @@ def main():
         # Determinar quais projetos processar
         target_project_numbers = []
         
-        if args.panel:
+        if panel:
             # Seleção interativa
-            target_project_numbers = select_panels_interactive(projects_list, args.field)
+            target_project_numbers = select_panels_interactive(projects_list, field, verbose)
             if not target_project_numbers:
                 print("❌ Nenhum projeto selecionado")
                 return
-        elif args.projects:
+        elif projects:
             # Projetos específicos via argumento
             try:
-                target_project_numbers = [int(p.strip()) for p in args.projects.split(',')]
+                target_project_numbers = [int(p.strip()) for p in projects.split(',')]
                 print(f"🎯 Projetos especificados via argumento: {target_project_numbers}")
             except ValueError:
                 print("❌ Formato inválido para --projects. Use números separados por vírgula")
@@ -771,92 +1054,122 @@ def main():
         # Carregar projetos completos com campos e filtrar
         print(f"\n🔍 Carregando projetos completos e filtrando...")
         projects_with_field = load_projects_with_fields_from_yaml(
-            'config/projects-panels-info.yml', target_project_numbers, args.field
+            PROJECTS_INFO_FILE, target_project_numbers, field, verbose
         )
         
         if not projects_with_field:
-            print(f"❌ Nenhum projeto encontrado com campo '{args.field}' nos números especificados")
+            print(f"❌ Nenhum projeto encontrado com campo '{field}' nos números especificados")
             return
         
         print(f"✅ {len(projects_with_field)} projetos serão processados")
         
         # Calcular since conforme flags de data (usar updatedAt)
         since_iso: Optional[str]
-        if args.all_issues or (hasattr(args, 'days') and args.days == 0):
+        if all_issues or days == 0:
             since_iso = None
-            if args.all_issues:
+            if all_issues:
                 print("⏩ Filtro por data desabilitado: --all-issues foi informado")
             else:
                 print("⏩ Filtro por data desabilitado: --days 0")
         else:
-            days = getattr(args, 'days', 7)
             base = dt.datetime.utcnow().replace(microsecond=0)
             since_dt = base - dt.timedelta(days=days)
             since_iso = since_dt.isoformat() + 'Z'
             print(f"⏱️  Aplicando filtro por updatedAt desde {since_iso} (últimos {days} dias)")
 
+        # Índices por ID do projeto, consultados para cada item de cada issue
+        target_by_id = {p['id']: p for p in projects_with_field}
+        field_by_project = {p['id']: get_project_field_id(p, field) for p in projects_with_field}
+        
         # Processar cada repositório
         total_changes = {"cleared": 0, "set": 0, "errors": 0, "archived_skipped": 0}
+        planned_total = 0
+        if dry_run:
+            print("🧪 Modo dry-run: as alterações serão listadas, mas não aplicadas")
+        
+        # Os itens dos projetos alvo já trazem status, data e o issue vinculado:
+        # consultas paginadas com vários projetos cada substituem a leitura de
+        # todas as issues da organização. As issues são agrupadas pelo
+        # repositório para seguir a ordem do CSV.
+        projects_items = list(zip(projects_with_field, get_projects_items(
+            github_token, projects_with_field, org, cache_manager, force_refresh, field,
+            with_title=verbose
+        )))
+        issues_by_repo: Dict[str, List[Dict[str, Any]]] = {}
+        for issue in issues_from_project_items(projects_items, since_iso):
+            issues_by_repo.setdefault(issue['repository']['name'], []).append(issue)
+        
+        # Só os repositórios do CSV com issues nos projetos alvo são percorridos;
+        # os demais não têm o que processar
+        repos_with_issues = [repo for repo in repos if repo.name in issues_by_repo]
+        print(f"📦 {len(issues_by_repo)} repositórios com issues nos projetos alvo "
+              f"({len(repos_with_issues)} listados em {repos_file})")
         
-        for i, repo in enumerate(repos, 1):
-            if repo.get('archived', False):
-                print(f"\n⏭️  Pulando repositório arquivado: {repo['name']}")
+        for i, repo in enumerate(repos_with_issues, 1):
+            if repo.archived:
+                logger.info("Pulando repositório arquivado: %s", repo.name)
                 continue
             
-            print(f"\n📁 Repositório {i}/{len(repos)}: {repo['name']}")
-            
             try:
-                # Obter issues do repositório com filtro opcional por data
-                issues = get_issues_from_repo(github_token, org, repo['name'], since_iso, 
-                                            cache_manager, args.force_refresh)
-                print(f"  📋 {len(issues)} issues encontrados")
+                # Issues do repositório nos projetos alvo (com filtro opcional por data)
+                issues = issues_by_repo.get(repo.name, [])
                 
                 # Processar apenas issues que mudaram (se cache não estiver desabilitado)
-                processed_count = 0
-                skipped_count = 0
+                if skip_cache:
+                    changed = issues
+                else:
+                    changed = [issue for issue in issues
+                               if issue_state.has_issue_changed(repo.name, issue['id'], issue)]
+                skipped_count = len(issues) - len(changed)
                 
-                for issue in issues:
-                    issue_id = issue['id']
-                    
-                    # Verificar se issue mudou (se cache não estiver desabilitado)
-                    if not args.skip_cache and not issue_state.has_issue_changed(
-                        repo['name'], issue_id, issue
-                    ):
-                        skipped_count += 1
-                        continue
-                    
-                    changes = process_issue_for_projects(
-                        github_token, issue, projects_with_field, args.field
-                    )
-                    
-                    # Acumular mudanças
-                    for key in total_changes:
-                        total_changes[key] += changes[key]
-                    
-                    # Marcar como processado
-                    issue_state.mark_issue_processed(repo['name'], issue_id, issue)
-                    processed_count += 1
+                # Fase 1: alterações calculadas a partir dos dados já obtidos
+                ops = plan_changes(changed, target_by_id, field_by_project, field)
                 
-                print(f"  📊 {processed_count} issues processados, {skipped_count} pulados (cache)")
+                # Uma linha por repositório; sem alterações, só com --verbose
+                logger.log(logging.INFO if ops else logging.DEBUG,
+                           "Repositório %d/%d: %s - %d issues encontrados, %d processados, "
+                           "%d pulados (cache), %d alterações",
+                           i, len(repos_with_issues), repo.name, len(issues), len(changed),
+                           skipped_count, len(ops))
                 
-                # Pausa entre repositórios para não sobrecarregar a API
-                if i < len(repos):
-                    print("  ⏳ Aguardando 2 segundos antes do próximo repositório...")
-                    time.sleep(2)
+                if dry_run:
+                    for op in ops:
+                        if op.kind == 'set':
+                            logger.info("      %s: definiria '%s' para %s (dry-run)", op.label, field, op.date)
+                        else:
+                            logger.info("      %s: limparia '%s' (dry-run)", op.label, field)
+                    planned_total += len(ops)
+                else:
+                    # Fase 2: envio em lote, antes de marcar os issues como processados
+                    if ops:
+                        logger.debug("  Enviando %d atualizações em lotes de %d...",
+                                     len(ops), MUTATION_BATCH_SIZE)
+                        changes = apply_changes(github_token, ops, field)
+                        for key in total_changes:
+                            total_changes[key] += changes[key]
+                        # A próxima execução deve planejar a partir dos valores já alterados
+                        for project_id in {op.project_id for op in ops}:
+                            invalidate_project_items(cache_manager, org, target_by_id[project_id], field)
+                    
+                    issue_state.mark_issues_processed(
+                        repo.name, [(issue['id'], issue) for issue in changed]
+                    )
                     
             except Exception as e:
-                print(f"❌ Erro ao processar repositório {repo['name']}: {e}")
+                logger.error("Erro ao processar repositório %s: %s", repo.name, e)
                 total_changes["errors"] += 1
         
         # Resumo final
         print("\n" + "=" * 60)
         print("🎯 PROCESSAMENTO CONCLUÍDO!")
-        print(f"📊 Total de repositórios processados: {len(repos)}")
+        print(f"📊 Total de repositórios processados: {len(repos_with_issues)}")
         print(f"📊 Total de projetos processados: {len(projects_with_field)}")
         print(f"✅ Campos limpos: {total_changes['cleared']}")
         print(f"📅 Campos preenchidos: {total_changes['set']}")
         print(f"⏭️  Itens arquivados ignorados: {total_changes['archived_skipped']}")
         print(f"❌ Erros encontrados: {total_changes['errors']}")
+        if dry_run:
+            print(f"🧪 Alterações planejadas (dry-run, não aplicadas): {planned_total}")
         
         if total_changes["errors"] == 0:
             print("🎉 Todas as operações foram concluídas com sucesso!")
@@ -868,10 +1181,21 @@ def main():
         sys.exit(1)
     except Exception as e:
         print(f"\n❌ Erro inesperado: {e}")
-        if args.verbose:
+        if verbose:
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        # Compacta os journals de estado abertos nesta execução
+        issue_state.close()
+
+def main():
+    """Função principal"""
+    args = parse_arguments()
+    # Detalhes por issue só com --verbose (DEBUG); alterações saem em INFO
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(message)s')
+    run(**vars(args))
 
 if __name__ == "__main__":
     main()
@@ -10,14 +10,43 @@ import yaml
 import os
 import time
 import argparse
-from datetime import datetime
+import functools
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from scripts.env_file import load_env_file
 from scripts.github_app_auth import get_github_app_installation_token
+from scripts import fast_json
+from scripts.rate_limiter import GHRateLimiter
 
 # Configurações padrão
 organization = 'splor-mg'
 repos_file = 'config/repos_list.csv'
 labels_file = 'config/labels.yaml'
 
+# Parser YAML em C (libyaml) quando disponível
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Consulta em lote das labels atuais (repositórios por query GraphQL)
+GRAPHQL_URL = 'https://api.github.com/graphql'
+LABELS_BATCH_SIZE = 25
+
+# Repositórios sincronizados em paralelo (sobrescreva com GH_SYNC_WORKERS)
+DEFAULT_SYNC_WORKERS = 8
+
+# Abaixo deste número de requisições restantes, as chamadas passam a ser
+# espaçadas até o reset (GHRateLimiter, por cota: REST e GraphQL)
+RATE_LIMIT_THRESHOLD = 50
+
+# Sessão usada quando o chamador não informa uma (ver _session)
+_SESSION = None
+
+# Caracteres descartados ao separar a lista --repos
+_REPO_NAMES_STRIP = str.maketrans('', '', ' \t\r\n')
+
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(
@@ -44,34 +73,25 @@ Exemplos de uso:
     
     return parser.parse_args()
 
-def load_env():
-    """Carrega variáveis de ambiente do arquivo .env"""
-    env_file = '.env'
-    if os.path.exists(env_file):
-        print(f"📁 Carregando variáveis de {env_file}...")
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
-        print("✅ Variáveis de ambiente carregadas")
-    else:
-        print(f"⚠️  Arquivo {env_file} não encontrado")
+def split_repo_names(text):
+    """Separa uma lista 'repo1, repo2,...' em nomes, descartando espaços e itens vazios"""
+    return [name for name in text.translate(_REPO_NAMES_STRIP).split(',') if name]
 
 def load_repos(repos_input, organization):
-    """Carrega repositórios de CSV ou lista separada por vírgula"""
+    """Carrega repositórios de CSV, lista separada por vírgula ou lista de nomes já separada"""
     repos = []
     
-    if ',' in repos_input:
-        # Lista separada por vírgula
-        repo_names = [repo.strip() for repo in repos_input.split(',')]
-        for repo_name in repo_names:
+    if isinstance(repos_input, str) and ',' in repos_input:
+        repos_input = split_repo_names(repos_input)
+    
+    if not isinstance(repos_input, str):
+        # Lista de nomes
+        for repo_name in repos_input:
             # Remove org/ se presente
             if '/' in repo_name:
-                repo_name = repo_name.split('/')[-1]
+                repo_name = repo_name.rsplit('/', 1)[-1]
             repos.append({'name': repo_name, 'archived': False})
-        print(f"📋 Carregando {len(repos)} repositórios da lista: {repos_input}")
+        print(f"📋 Carregando {len(repos)} repositórios da lista: {', '.join(repos_input)}")
     else:
         # Arquivo CSV
         csv_file = repos_input
@@ -109,6 +129,12 @@ def load_repos_from_csv(csv_file):
     print(f"✅ {len(repos)} repositórios carregados")
     return repos
 
+@functools.lru_cache(maxsize=2)
+def _read_yaml(yaml_file, mtime):
+    """Lê e interpreta o YAML; o mtime na chave invalida o cache se o arquivo mudar"""
+    with open(yaml_file, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
 def load_labels_from_yaml(yaml_file):
     """Carrega as labels do arquivo YAML"""
     labels = []
@@ -120,24 +146,116 @@ def load_labels_from_yaml(yaml_file):
     print(f"🏷️  Carregando labels de {yaml_file}...")
     
     try:
-        with open(yaml_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-            if data and 'labels' in data:
-                labels = data['labels']
-                print(f"✅ {len(labels)} labels carregadas")
-            else:
-                print("⚠️  Nenhuma label encontrada no arquivo YAML")
+        data = _read_yaml(yaml_file, os.stat(yaml_file).st_mtime_ns)
+        if data and 'labels' in data:
+            labels = list(data['labels'])
+            print(f"✅ {len(labels)} labels carregadas")
+        else:
+            print("⚠️  Nenhuma label encontrada no arquivo YAML")
     except yaml.YAMLError as e:
         print(f"❌ Erro ao ler arquivo YAML: {e}")
     
     return labels
 
-def sync_labels_for_repo(repo_name, labels, token, organization, delete_extras=False):
+def _session():
+    """Sessão HTTP do módulo com o GHRateLimiter instalado, criada na primeira chamada
+
+    As threads de sincronização a compartilham, então o espaçamento vale para
+    todos os repositórios em paralelo e evita o limite secundário do GitHub.
+    """
+    global _SESSION
+    if _SESSION is None:
+        session = requests.Session()
+        GHRateLimiter(threshold=RATE_LIMIT_THRESHOLD).attach(session)
+        _SESSION = session
+    return _SESSION
+
+def batch_fetch_labels(organization, repo_names, token, session=None, batch_size=LABELS_BATCH_SIZE):
+    """Obtém as labels atuais de vários repositórios com consultas GraphQL em lote
+
+    Cada consulta usa aliases (r0, r1, ...) para até `batch_size` repositórios.
+    Retorna {nome_do_repo: [labels]}; repositórios ausentes do resultado (lote
+    com erro, repositório inacessível ou mais de 100 labels) devem ter as labels
+    obtidas individualmente por sync_labels_for_repo.
+    """
+    http = session or _session()
+    headers = {'Authorization': f'bearer {token}'}
+    result = {}
+    
+    for start in range(0, len(repo_names), batch_size):
+        batch = repo_names[start:start + batch_size]
+        fields = ' '.join(
+            f'r{i}: repository(owner: {json.dumps(organization)}, name: {json.dumps(name)}) '
+            '{ labels(first: 100) { totalCount nodes { name color description } } }'
+            for i, name in enumerate(batch)
+        )
+        response = fast_json.post_json(http, GRAPHQL_URL, {'query': f'query {{ {fields} }}'},
+                                       headers=headers)
+        if response.status_code == 401:
+            # Token inválido/expirado: o chamador decide como prosseguir
+            response.raise_for_status()
+        if response.status_code != 200:
+            print(f"    ⚠️  Consulta em lote das labels falhou: {response.status_code}")
+            continue
+        
+        data = fast_json.response_json(response).get('data') or {}
+        for i, name in enumerate(batch):
+            repo = data.get(f'r{i}')
+            if not repo:
+                continue
+            repo_labels = repo['labels']
+            if repo_labels['totalCount'] > len(repo_labels['nodes']):
+                continue
+            result[name] = repo_labels['nodes']
+    
+    print(f"📋 Labels atuais obtidas em lote para {len(result)}/{len(repo_names)} repositórios")
+    return result
+
+def labels_hash(labels, names=None):
+    """Hash estável de um conjunto de labels (nome, cor e descrição)
+
+    Se `names` (nomes em minúsculas) for informado, considera apenas essas labels.
+    """
+    canonical = sorted(
+        (label['name'], label['color'], label.get('description') or '')
+        for label in labels
+        if names is None or label['name'].lower() in names
+    )
+    return hashlib.blake2b(fast_json.dumps(canonical), digest_size=16).hexdigest()
+
+def label_sync_fingerprint(labels, delete_extras=False):
+    """Identifica o template e o modo de uma sincronização (gravado no estado por repositório)"""
+    return f"{labels_hash(labels)}{'+extras' if delete_extras else ''}"
+
+def load_label_sync_state(cache_manager, organization):
+    """Estado da última sincronização: {repositório: fingerprint}
+
+    Um repositório entra no estado só quando sincronizou sem erros; o TTL do
+    cache 'labels' limita por quanto tempo ele é pulado sem consultar a API.
+    """
+    state = cache_manager.get('labels', f"{organization}_sync_state", quiet=True) or {}
+    return state.get('repos', {})
+
+def save_label_sync_state(cache_manager, organization, repos_state):
+    """Grava o estado {repositório: fingerprint} ao final da sincronização"""
+    cache_manager.set('labels', {'repos': repos_state}, f"{organization}_sync_state", quiet=True)
+
+def sync_labels_for_repo(repo_name, labels, token, organization, delete_extras=False, session=None,
+                         current_labels=None, out=print):
     """Sincroniza labels para um repositório específico
 
     Observação: o cabeçalho do repositório (📁 Repositório i/N: <nome>) é impresso pelo chamador.
     Esta função imprime apenas linhas internas com indentação padronizada.
+
+    Se `session` (requests.Session) for informada, as requisições reaproveitam
+    suas conexões; caso contrário usa-se a sessão do módulo (_session).
+    `current_labels` permite informar as labels atuais já obtidas (ex: por
+    batch_fetch_labels), dispensando a consulta REST ao repositório.
+    `out` recebe cada linha de saída (padrão: print); com vários repositórios
+    em paralelo, o chamador passa um buffer por repositório e o imprime junto
+    com o cabeçalho quando o repositório termina.
     """
+    http = session or _session()
     
     headers = {
         'Accept': 'application/vnd.github.v3+json',
@@ -153,37 +271,62 @@ def sync_labels_for_repo(repo_name, labels, token, organization, delete_extras=F
     adjusted_description_count = 0
     unchanged_count = 0
     
-    # Primeiro, obter todas as labels atuais do repositório
-    print("  📋 Obtendo labels atuais do repositório...")
-    current_labels_url = f"https://api.github.com/repos/{organization}/{repo_name}/labels"
-    
-    try:
-        current_response = requests.get(current_labels_url, headers=headers)
-        if current_response.status_code == 200:
-            current_labels = current_response.json()
-            # Criar mapeamento case-insensitive das labels existentes
-            current_labels_map = {}
-            for label in current_labels:
-                current_labels_map[label['name'].lower()] = {
-                    'name': label['name'],
-                    'color': label['color'],
-                    'description': label.get('description', '')
-                }
-            print(f"    📊 {len(current_labels)} labels encontradas no repositório")
-        else:
-            print(f"    ❌ Erro ao obter labels atuais: {current_response.status_code}")
+    # Primeiro, obter todas as labels atuais do repositório (se não informadas)
+    if current_labels is None:
+        out("  📋 Obtendo labels atuais do repositório...")
+        current_labels_url = f"https://api.github.com/repos/{organization}/{repo_name}/labels"
+        
+        try:
+            current_response = http.get(current_labels_url, headers=headers)
+            if current_response.status_code == 401:
+                # Token inválido/expirado: o chamador decide se renova e tenta de novo
+                current_response.raise_for_status()
+            if current_response.status_code == 200:
+                current_labels = fast_json.response_json(current_response)
+            else:
+                out(f"    ❌ Erro ao obter labels atuais: {current_response.status_code}")
+                return 0, 0, 1
+        except requests.HTTPError:
+            raise
+        except Exception as e:
+            out(f"    ❌ Erro ao obter labels atuais: {e}")
             return 0, 0, 1
-    except Exception as e:
-        print(f"    ❌ Erro ao obter labels atuais: {e}")
-        return 0, 0, 1
+    
+    # Criar mapeamento case-insensitive das labels existentes
+    current_labels_map = {}
+    for label in current_labels:
+        current_labels_map[label['name'].lower()] = {
+            'name': label['name'],
+            'color': label['color'],
+            'description': label.get('description') or ''
+        }
+    out(f"    📊 {len(current_labels)} labels encontradas no repositório")
+    
+    # Atalho: labels do repositório idênticas ao template (considerando as
+    # extras só quando serão removidas) dispensam a comparação label a label
+    template_names = {label['name'].lower() for label in labels}
+    remote_hash = labels_hash(current_labels, None if delete_extras else template_names)
+    if remote_hash == labels_hash(labels):
+        out(f"  ✅ Labels já sincronizadas ({len(labels)} inalteradas)")
+        details = {
+            'processed': len(labels),
+            'created': 0,
+            'updated_name': 0,
+            'adjusted_color': 0,
+            'adjusted_description': 0,
+            'deleted': 0,
+            'unchanged': len(labels),
+            'errors': 0,
+        }
+        return len(labels), 0, 0, details
     
     # Processar cada label do template
     for label in labels:
         label_name = label['name']
         label_color = label['color']
-        label_description = label.get('description', '')
+        label_description = label.get('description') or ''
         
-        print(f"  🏷️  Processando label: {label_name}")
+        out(f"  🏷️  Processando label: {label_name}")
         
         # Verificar se a label já existe (case-insensitive)
         label_name_lower = label_name.lower()
@@ -203,7 +346,7 @@ def sync_labels_for_repo(repo_name, labels, token, organization, delete_extras=F
             if needs_update:
                 # Log específico para ajuste de formato
                 if existing_name != label_name:
-                    print(f"      🔄 Ajustando formato do nome da label: '{existing_name}' → '{label_name}'")
+                    out(f"      🔄 Ajustando formato do nome da label: '{existing_name}' → '{label_name}'")
                     updated_name_count += 1
                 if existing_color != label_color:
                     adjusted_color_count += 1
@@ -219,18 +362,18 @@ def sync_labels_for_repo(repo_name, labels, token, organization, delete_extras=F
                 }
                 
                 try:
-                    response = requests.patch(update_url, headers=headers, json=update_data)
+                    response = http.patch(update_url, headers=headers, json=update_data)
                     if response.status_code == 200:
-                        print(f"      ✅ Label '{label_name}' atualizada com sucesso")
+                        out(f"      ✅ Label '{label_name}' atualizada com sucesso")
                         success_count += 1
                     else:
-                        print(f"      ❌ Erro ao atualizar label '{label_name}': {response.status_code}")
+                        out(f"      ❌ Erro ao atualizar label '{label_name}': {response.status_code}")
                         error_count += 1
                 except Exception as e:
-                    print(f"      ❌ Erro ao atualizar label '{label_name}': {e}")
+                    out(f"      ❌ Erro ao atualizar label '{label_name}': {e}")
                     error_count += 1
             else:
-                print(f"      ✅ Label '{label_name}' já está atualizada")
+                out(f"      ✅ Label '{label_name}' já está atualizada")
                 success_count += 1
                 unchanged_count += 1
         else:
@@ -243,16 +386,16 @@ def sync_labels_for_repo(repo_name, labels, token, organization, delete_extras=F
             }
             
             try:
-                response = requests.post(create_url, headers=headers, json=create_data)
+                response = http.post(create_url, headers=headers, json=create_data)
                 if response.status_code == 201:
-                    print(f"      ✅ Label '{label_name}' criada com sucesso")
+                    out(f"      ✅ Label '{label_name}' criada com sucesso")
                     success_count += 1
                     created_count += 1
                 else:
-                    print(f"      ❌ Erro ao criar label '{label_name}': {response.status_code}")
+                    out(f"      ❌ Erro ao criar label '{label_name}': {response.status_code}")
                     error_count += 1
             except Exception as e:
-                print(f"      ❌ Erro ao criar label '{label_name}': {e}")
+                out(f"      ❌ Erro ao criar label '{label_name}': {e}")
                 error_count += 1
         
         # Pequena pausa para não sobrecarregar a API
@@ -260,40 +403,40 @@ def sync_labels_for_repo(repo_name, labels, token, organization, delete_extras=F
     
     # Remover labels extras se habilitado
     if delete_extras:
-        print("  🗑️  Verificando labels extras para remoção...")
+        out("  🗑️  Verificando labels extras para remoção...")
         
         # Obter labels que não estão no template (case-insensitive)
         template_label_names_lower = {label['name'].lower() for label in labels}
         extra_labels = [name for name in current_labels_map.keys() if name not in template_label_names_lower]
         
         if extra_labels:
-            print(f"    📋 {len(extra_labels)} labels extras encontradas para remoção")
+            out(f"    📋 {len(extra_labels)} labels extras encontradas para remoção")
             
             for extra_label_name_lower in extra_labels:
                 extra_label_name = current_labels_map[extra_label_name_lower]['name']
                 delete_url = f"https://api.github.com/repos/{organization}/{repo_name}/labels/{extra_label_name}"
                 
                 try:
-                    response = requests.delete(delete_url, headers=headers)
+                    response = http.delete(delete_url, headers=headers)
                     if response.status_code == 204:
-                        print(f"      🗑️  Label '{extra_label_name}' removida com sucesso")
+                        out(f"      🗑️  Label '{extra_label_name}' removida com sucesso")
                         deleted_count += 1
                     else:
-                        print(f"      ❌ Erro ao remover label '{extra_label_name}': {response.status_code}")
+                        out(f"      ❌ Erro ao remover label '{extra_label_name}': {response.status_code}")
                         error_count += 1
                     
                     # Pequena pausa para não sobrecarregar a API
                     time.sleep(0.1)
                     
                 except Exception as e:
-                    print(f"      ❌ Erro ao remover label '{extra_label_name}': {e}")
+                    out(f"      ❌ Erro ao remover label '{extra_label_name}': {e}")
                     error_count += 1
         else:
-            print("    ✅ Nenhuma label extra encontrada para remoção")
+            out("    ✅ Nenhuma label extra encontrada para remoção")
     else:
-        print("  ⏭️  Remoção de labels extras desabilitada")
+        out("  ⏭️  Remoção de labels extras desabilitada")
     
-    print(f"  📊 Resumo: {success_count} labels processadas, {deleted_count} deletadas, {error_count} erros")
+    out(f"  📊 Resumo: {success_count} labels processadas, {deleted_count} deletadas, {error_count} erros")
     details = {
         'processed': success_count + error_count,  # aproximação
         'created': created_count,
@@ -315,7 +458,7 @@ def sync_single_repo(repo_full_name, labels, token, delete_extras=False):
     org, repo = repo_full_name.split('/', 1)
     print(f"🎯 Sincronizando repositório específico: {org}/{repo}")
     
-    success, deleted, errors = sync_labels_for_repo(repo, labels, token, org, delete_extras)
+    success, deleted, errors = sync_labels_for_repo(repo, labels, token, org, delete_extras)[:3]
     
     if errors == 0:
         print(f"✅ Labels sincronizadas com sucesso para {org}/{repo}")
@@ -329,7 +472,7 @@ def main():
     args = parse_arguments()
     
     # Carregar variáveis de ambiente
-    load_env()
+    load_env_file()
     
     # Obter token do GitHub via App
     try:
@@ -340,53 +483,83 @@ def main():
         return
     
     # Configurar parâmetros baseado nos argumentos
-    if args.org:
-        organization = args.org
-    if args.labels:
-        labels_file = args.labels
+    org = args.org or organization
+    labels_path = args.labels or labels_file
     
     # Carregar labels
-    labels = load_labels_from_yaml(labels_file)
+    labels = load_labels_from_yaml(labels_path)
     if not labels:
         return
     
     # Se foi especificado repositórios específicos
     if args.repos:
-        repos = load_repos(args.repos, organization)
+        repos = load_repos(args.repos, org)
         if not repos:
             return
         print(f"🎯 Sincronizando {len(repos)} repositórios específicos")
     else:
         # Carregar repositórios do CSV padrão
-        repos = load_repos(repos_file, organization)
+        repos = load_repos(repos_file, org)
         if not repos:
             return
     
-    print(f"\n🚀 Iniciando sincronização de labels para {len(repos)} repositórios...")
+    active = [repo for repo in repos if not repo.get('archived')]
+    if len(active) < len(repos):
+        print(f"⏭️  {len(repos) - len(active)} repositórios arquivados ignorados")
+    
+    # Repositórios já sincronizados com este template em execução anterior
+    from scripts.cache_manager import CacheManager
+    state_cache = CacheManager()
+    fingerprint = label_sync_fingerprint(labels, args.delete_extras)
+    sync_state = load_label_sync_state(state_cache, org)
+    in_sync = [repo for repo in active if sync_state.get(repo['name']) == fingerprint]
+    if in_sync:
+        active = [repo for repo in active if sync_state.get(repo['name']) != fingerprint]
+        print(f"✅ {len(in_sync)} repositórios já sincronizados em execução anterior (estado em cache)")
+    
+    print(f"\n🚀 Iniciando sincronização de labels para {len(active)} repositórios...")
     print("=" * 60)
     
     total_success = 0
     total_deleted = 0
     total_errors = 0
     
-    # Processar cada repositório
-    for i, repo in enumerate(repos, 1):
-        print(f"\n📁 Repositório {i}/{len(repos)}")
-        
-        success, deleted, errors = sync_labels_for_repo(repo, labels, github_token, organization, args.delete_extras)
-        total_success += success
-        total_deleted += deleted
-        total_errors += errors
-        
-        # Pausa entre repositórios para não sobrecarregar a API
-        if i < len(repos):
-            print("  ⏳ Aguardando 2 segundos antes do próximo repositório...")
-            time.sleep(2)
+    # Processar os repositórios em paralelo (o rate limit é tratado pelo
+    # GHRateLimiter da sessão, dispensando a pausa fixa entre repositórios)
+    workers = int(os.getenv('GH_SYNC_WORKERS', str(DEFAULT_SYNC_WORKERS)))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # Saída de cada repositório guardada à parte e impressa de uma vez,
+        # junto com o cabeçalho, quando ele termina (sem linhas intercaladas)
+        futures = {}
+        for repo in active:
+            lines = []
+            future = executor.submit(sync_labels_for_repo, repo['name'], labels, github_token, org,
+                                     args.delete_extras, out=lines.append)
+            futures[future] = (repo, lines)
+        for i, future in enumerate(as_completed(futures), 1):
+            repo, lines = futures[future]
+            repo_name = repo['name']
+            try:
+                success, deleted, errors = future.result()[:3]
+            except Exception as e:
+                print("\n".join([f"\n❌ Repositório {i}/{len(active)}: {repo_name} - {e}", *lines]))
+                total_errors += 1
+                sync_state.pop(repo_name, None)
+                continue
+            if errors:
+                sync_state.pop(repo_name, None)
+            else:
+                sync_state[repo_name] = fingerprint
+            print("\n".join([f"\n📁 Repositório {i}/{len(active)}: {repo_name} ({errors} erros)", *lines]))
+            total_success += success
+            total_deleted += deleted
+            total_errors += errors
+    save_label_sync_state(state_cache, org, sync_state)
     
     # Resumo final
     print("\n" + "=" * 60)
     print("🎯 SINCRONIZAÇÃO CONCLUÍDA!")
-    print(f"📊 Total de repositórios processados: {len(repos)}")
+    print(f"📊 Total de repositórios processados: {len(active)}")
     print(f"✅ Labels processadas com sucesso: {total_success}")
     print(f"🗑️  Labels deletadas: {total_deleted}")
     print(f"❌ Erros encontrados: {total_errors}")
@@ -400,7 +573,7 @@ def main():
     else:
         print("⚠️  Algumas labels tiveram problemas. Verifique os logs acima.")
     
-    print(f"\n💡 Verifique os repositórios em: https://github.com/{organization}")
+    print(f"\n💡 Verifique os repositórios em: https://github.com/{org}")
 
 if __name__ == "__main__":
     main()
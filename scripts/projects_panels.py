@@ -34,9 +34,10 @@ from typing import Any, Dict, List, Optional
 from datetime import datetime
 import requests
 import yaml
-from dotenv import load_dotenv
 
 from .cache_manager import CacheManager, log_cache_stats
+from scripts import fast_json
+from scripts.env_file import load_env_file
 from scripts.github_app_auth import get_github_app_installation_token
 
 # Configurações padrão
@@ -44,24 +45,19 @@ DEFAULT_ORG = 'splor-mg'
 DEFAULT_OUTPUT = 'config/projects-panels-info.yml'
 DEFAULT_LIST_OUTPUT = 'config/projects-panels-list.yml'
 
-# Load environment variables from .env file
-def load_dotenv():
-    """Load environment variables from .env file."""
-    env_file = Path('.env')
-    if env_file.exists():
-        print(f"📁 Carregando variáveis de {env_file}...")
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
-        print("✅ Variáveis de ambiente carregadas")
-    else:
-        print(f"⚠️  Arquivo {env_file} não encontrado")
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+GRAPHQL_TIMEOUT = 30
 
+# Sessão HTTP do módulo, criada na primeira chamada (ver _session)
+_SESSION: Optional[requests.Session] = None
+
+# Arquivo de info gravado por run() neste processo, por organização
+_REFRESHED_INFO: Dict[str, Path] = {}
 
-GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+def refreshed_info_path(org: str) -> Optional[Path]:
+    """Caminho do projects-panels-info gerado nesta execução para a organização, se houver"""
+    return _REFRESHED_INFO.get(org)
 
 
 def _require_env(name: str) -> str:
@@ -72,25 +68,99 @@ def _require_env(name: str) -> str:
     return value
 
 
+def _session() -> requests.Session:
+    """Sessão HTTP persistente: reaproveita a conexão TLS entre as páginas da consulta."""
+    global _SESSION
+    if _SESSION is None:
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "Connection": "keep-alive",
+        })
+        # Só consultas (leitura): repetir é seguro; 429 respeita o Retry-After
+        retry = Retry(total=5, backoff_factor=1, status_forcelist=[429, 502, 503, 504],
+                      allowed_methods=["POST"], raise_on_status=False)
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4,
+                                              max_retries=retry))
+        _SESSION = session
+    return _SESSION
+
+
 def _graphql(token: str, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
     """Execute GraphQL query against GitHub API."""
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
-    resp = requests.post(
-        GITHUB_GRAPHQL_URL, 
-        json={"query": query, "variables": variables}, 
-        headers=headers
+    # O token vai por requisição: ele pode ser renovado durante a execução.
+    # Corpo e resposta via fast_json (orjson quando instalado)
+    resp = fast_json.post_json(
+        _session(), GITHUB_GRAPHQL_URL,
+        {"query": query, "variables": variables},
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=GRAPHQL_TIMEOUT
     )
     if resp.status_code != 200:
         raise RuntimeError(f"GraphQL HTTP {resp.status_code}: {resp.text}")
-    data = resp.json()
+    data = fast_json.response_json(resp)
     if "errors" in data:
         raise RuntimeError(f"GraphQL errors: {json.dumps(data['errors'], ensure_ascii=False)}")
     return data["data"]
 
 
+# Projetos da organização com seus campos (montada uma vez na importação)
+ORG_PROJECTS_QUERY = """
+query($org: String!, $cursor: String) {
+  organization(login: $org) {
+    projectsV2(first: 100, after: $cursor) {
+      nodes {
+        id
+        number
+        title
+        shortDescription
+        fields(first: 100) {
+          nodes {
+            ... on ProjectV2Field {
+              id
+              name
+              dataType
+            }
+            ... on ProjectV2SingleSelectField {
+              id
+              name
+              dataType
+              options {
+                id
+                name
+                description
+                color
+              }
+            }
+            ... on ProjectV2IterationField {
+              id
+              name
+              dataType
+              configuration {
+                iterations {
+                  id
+                  title
+                  startDate
+                }
+              }
+            }
+
+          }
+        }
+      }
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+    }
+  }
+}
+"""
+
+
 def get_organization_projects(token: str, org: str, 
                             cache_manager: Optional[CacheManager] = None,
                             force_refresh: bool = False) -> List[Dict[str, Any]]:
@@ -106,64 +176,13 @@ def get_organization_projects(token: str, org: str,
             return cached_projects.get('projects', [])
     
     print(f"🔄 Buscando projetos da organização {org}...")
-    query = """
-    query($org: String!, $cursor: String) {
-      organization(login: $org) {
-        projectsV2(first: 100, after: $cursor) {
-          nodes {
-            id
-            number
-            title
-            shortDescription
-            fields(first: 100) {
-              nodes {
-                ... on ProjectV2Field {
-                  id
-                  name
-                  dataType
-                }
-                ... on ProjectV2SingleSelectField {
-                  id
-                  name
-                  dataType
-                  options {
-                    id
-                    name
-                    description
-                    color
-                  }
-                }
-                ... on ProjectV2IterationField {
-                  id
-                  name
-                  dataType
-                  configuration {
-                    iterations {
-                      id
-                      title
-                      startDate
-                    }
-                  }
-                }
-
-              }
-            }
-          }
-          pageInfo {
-            hasNextPage
-            endCursor
-          }
-        }
-      }
-    }
-    """
     
     all_projects = []
     cursor = None
     
     while True:
         variables = {"org": org, "cursor": cursor}
-        data = _graphql(token, query, variables)
+        data = _graphql(token, ORG_PROJECTS_QUERY, variables)
         
         projects = data["organization"]["projectsV2"]["nodes"]
         all_projects.extend(projects)
@@ -333,20 +352,24 @@ Exemplos de uso:
     return parser.parse_args()
 
 
-def main() -> None:
-    """Main function."""
-    args = parse_args()
-    
+def run(*, org: Optional[str] = None, output: Optional[str] = None,
+        list_output: Optional[str] = None, only_info: bool = False,
+        only_list: bool = False, verbose: bool = False, force_refresh: bool = False,
+        cache_dir: str = "logs/cache", cache_stats: bool = False) -> bool:
+    """Extract projects and save the YAML files (entry point for direct calls).
+
+    Returns False if the extraction fails; only main() turns that into an exit code.
+    """
     # Inicializar cache manager
-    cache_manager = CacheManager(cache_dir=args.cache_dir)
+    cache_manager = CacheManager(cache_dir=cache_dir)
     
     # Mostrar estatísticas de cache se solicitado
-    if args.cache_stats:
+    if cache_stats:
         log_cache_stats(cache_manager)
-        return
+        return True
     
     # Carregar variáveis de ambiente
-    load_dotenv()
+    load_env_file()
     
     # Get GitHub token via GitHub App
     token = get_github_app_installation_token()
@@ -356,26 +379,23 @@ def main() -> None:
     # 2. Variáveis de ambiente (prioridade média)
     # 3. Valores padrão (menor prioridade)
     
-    org = args.org or os.getenv("GITHUB_ORG") or DEFAULT_ORG
+    org = org or os.getenv("GITHUB_ORG") or DEFAULT_ORG
     # Determinar quais arquivos salvar com base nos argumentos fornecidos
-    # Suporte a modo forçado via env PROJECTS_ONLY_MODE (setado pelo main)
+    # Suporte a modo forçado via env PROJECTS_ONLY_MODE (compatibilidade)
     only_mode_env = os.getenv("PROJECTS_ONLY_MODE", "").lower().strip()
     if only_mode_env == "info":
-        args.only_info = True
-        args.only_list = False
+        only_info = True
+        only_list = False
     elif only_mode_env == "list":
-        args.only_info = False
-        args.only_list = True
-    provided_output = args.output is not None
-    provided_list_output = args.list_output is not None
+        only_info = False
+        only_list = True
+    provided_output = output is not None
+    provided_list_output = list_output is not None
 
-    if args.only_info and args.only_list:
+    if only_info and only_list:
         # Em caso de conflito, prioriza update completo
         only_info = False
         only_list = False
-    else:
-        only_info = args.only_info
-        only_list = args.only_list
 
     if only_info:
         save_info = True
@@ -388,10 +408,10 @@ def main() -> None:
         # se só um caminho for especificado, gera apenas aquele
         save_info = provided_output or (not provided_output and not provided_list_output)
         save_list = provided_list_output or (not provided_output and not provided_list_output)
-    output = args.output if provided_output else (DEFAULT_OUTPUT if save_info else None)
-    list_output = args.list_output if provided_list_output else (DEFAULT_LIST_OUTPUT if save_list else None)
+    output = output if provided_output else (DEFAULT_OUTPUT if save_info else None)
+    list_output = list_output if provided_list_output else (DEFAULT_LIST_OUTPUT if save_list else None)
     
-    if args.verbose:
+    if verbose:
         print(f"🔍 Extraindo projetos da organização: {org}")
         print(f"📁 Arquivo de saída (info): {output if save_info else '— (não salvar)'}")
         print(f"📋 Arquivo de lista: {list_output if save_list else '— (não salvar)'}")
@@ -404,11 +424,11 @@ def main() -> None:
     try:
         # Get all projects from organization
         print(f"📊 Buscando projetos da organização '{org}'...")
-        projects = get_organization_projects(token, org, cache_manager, args.force_refresh)
+        projects = get_organization_projects(token, org, cache_manager, force_refresh)
         
         if not projects:
             print(f"⚠️  Nenhum projeto encontrado na organização '{org}'")
-            return
+            return True
         
         print(f"✅ Encontrados {len(projects)} projetos")
         
@@ -427,6 +447,7 @@ def main() -> None:
         # Save to YAML files
         if save_info and yaml_data is not None:
             save_yaml(yaml_data, str(output_path))
+            _REFRESHED_INFO[org] = output_path.resolve()
         if save_list and list_data is not None:
             save_yaml(list_data, str(list_output_path))
         
@@ -444,12 +465,19 @@ def main() -> None:
             print(f"   Total de campos: {total_fields}")
             for project in yaml_data["projects"]:
                 print(f"   - {project['name']} (#{project['number']}): {len(project['fields'])} campos")
+        return True
         
     except Exception as e:
         print(f"❌ Erro durante a extração: {e}")
-        if args.verbose:
+        if verbose:
             import traceback
             traceback.print_exc()
+        return False
+
+
+def main() -> None:
+    """Main function."""
+    if not run(**vars(parse_args())):
         sys.exit(1)
 
 
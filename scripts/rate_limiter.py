@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Controle do rate limit da API do GitHub.
+
+O GHRateLimiter lê X-RateLimit-Remaining / X-RateLimit-Reset de cada
+resposta e, quando a cota restante fica baixa, distribui as chamadas que
+faltam até o reset em vez de deixar a cota zerar e a API responder 403.
+
+REST (core), GraphQL e busca têm cotas independentes; o GitHub informa a
+qual delas a resposta pertence em X-RateLimit-Resource, e cada uma é
+acompanhada separadamente.
+"""
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Abaixo desta cota restante as requisições passam a ser espaçadas
+PACING_THRESHOLD = 500
+
+# Cota assumida quando a resposta não traz X-RateLimit-Resource
+DEFAULT_RESOURCE = 'core'
+
+
+class _Bucket:
+    """Estado de uma cota: restante, reset e o próximo horário reservado."""
+
+    __slots__ = ('remaining', 'reset_epoch', 'next_at')
+
+    def __init__(self, remaining: int, reset_epoch: int):
+        self.remaining = remaining
+        self.reset_epoch = reset_epoch
+        self.next_at = 0.0
+
+
+class GHRateLimiter:
+    """Espaça as requisições de acordo com a cota informada pelo GitHub.
+
+    Seguro entre threads: os horários das próximas chamadas são reservados
+    sob um lock, de modo que N threads juntas respeitam o mesmo intervalo.
+    Depois de cada resposta, o espaçamento segue a cota dessa resposta.
+    """
+
+    def __init__(self, threshold: int = PACING_THRESHOLD):
+        self.threshold = threshold
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def remaining(self, resource: str = DEFAULT_RESOURCE) -> Optional[int]:
+        """Cota restante conhecida de `resource` (None se ainda não informada)."""
+        bucket = self._buckets.get(resource)
+        return bucket.remaining if bucket else None
+
+    def update(self, response) -> Optional[str]:
+        """Atualiza a cota a partir dos cabeçalhos; retorna o recurso da resposta."""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return None
+        try:
+            remaining, reset = int(remaining), int(reset)
+        except ValueError:
+            return None
+        resource = response.headers.get('X-RateLimit-Resource') or DEFAULT_RESOURCE
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            if bucket is None:
+                self._buckets[resource] = _Bucket(remaining, reset)
+            else:
+                bucket.remaining, bucket.reset_epoch = remaining, reset
+        logger.debug("rate[%s]: %d restantes até %ds", resource, remaining, reset)
+        return resource
+
+    def _delay(self, resource: str) -> float:
+        """Reserva o próximo horário livre da cota e retorna quanto esperar por ele."""
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            if bucket is None or bucket.remaining >= self.threshold:
+                return 0.0
+            window = max(0, bucket.reset_epoch - now)
+            if bucket.remaining <= 0:
+                # Cota esgotada: só volta a chamar após o reset
+                return window + 1
+            spacing = max(0.0, window / bucket.remaining - 0.1)
+            start = max(now, bucket.next_at)
+            bucket.next_at = start + spacing
+            return start - now
+
+    def wait(self, resource: str = DEFAULT_RESOURCE) -> None:
+        """Aguarda o intervalo necessário antes da próxima requisição à cota."""
+        delay = self._delay(resource)
+        if delay > 0:
+            logger.debug("rate[%s]: aguardando %.1fs (%s restantes)",
+                         resource, delay, self.remaining(resource))
+            time.sleep(delay)
+
+    def hook(self, response, *args, **kwargs):
+        """Hook de resposta do requests: registra a cota e espaça a próxima chamada."""
+        resource = self.update(response)
+        if resource is not None:
+            self.wait(resource)
+        return response
+
+    def attach(self, session) -> None:
+        """Instala o limitador em uma requests.Session."""
+        session.hooks['response'].append(self.hook)
@@ -1,13 +1,37 @@
 import requests
 import csv
+import itertools
 import os
 import yaml
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from scripts.github_app_auth import get_github_app_installation_token
+from scripts import fast_json
 from cache_manager import CacheManager
 
+GRAPHQL_URL = 'https://api.github.com/graphql'
 
+# Repositórios da organização com o filtro de arquivados aplicado pela API;
+# o alias `archived` traz só a contagem dos arquivados
+REPOS_GRAPHQL_QUERY = """
+query($org: String!, $cursor: String) {
+  organization(login: $org) {
+    repositories(first: 100, after: $cursor%s) {
+      pageInfo { hasNextPage endCursor }
+      nodes { name isArchived }
+    }
+    archived: repositories(isArchived: true) { totalCount }
+  }
+}
+"""
+
+# Campos do repositório mantidos em memória e no cache (CSV, prévia e sync);
+# o restante do objeto da API REST é descartado assim que a página chega
+REPO_FIELDS = ('name', 'archived', 'language')
+
+# Repositórios já obtidos neste processo, por organização (evita repaginar
+# a organização quando várias operações rodam na mesma execução, ex: --all)
+_REPOS_MEMO: Dict[str, List[Dict[str, Any]]] = {}
 
 def load_labels_from_yaml(labels_file):
     """
@@ -44,25 +68,52 @@ def load_labels_from_yaml(labels_file):
         print(f"❌ Erro ao carregar arquivo YAML: {e}")
         return None
 
-def get_github_repos(organization, token=None, cache_manager: Optional[CacheManager] = None, 
-                    force_refresh: bool = False) -> List[Dict[str, Any]]:
+def listed_repos(organization) -> Optional[List[Dict[str, Any]]]:
     """
-    Obtém todos os repositórios de uma organização do GitHub com cache inteligente
+    Retorna a listagem completa da organização já obtida neste processo
+
+    None se iter_github_repos ainda não percorreu a organização até o fim.
+    """
+    return _REPOS_MEMO.get(organization)
+
+def iter_github_repos(organization, token=None, cache_manager: Optional[CacheManager] = None,
+                      force_refresh: bool = False, session=None) -> Iterator[Dict[str, Any]]:
+    """
+    Itera sobre os repositórios de uma organização do GitHub, página a página
+
+    Os repositórios são entregues à medida que cada página chega da API, o que
+    permite ao chamador processá-los (ex: gravar no CSV) sem esperar a
+    paginação inteira. Usa o mesmo cache de get_github_repos. Cada repositório
+    traz apenas os campos de REPO_FIELDS.
+
+    Cada página é pedida com If-None-Match (ETag da última resposta); quando
+    o GitHub responde 304 a página é lida do cache local, sem consumir a cota
+    de requisições. Isso vale inclusive com force_refresh.
+
+    `session` (requests.Session) é opcional e permite reaproveitar conexões.
     """
     if cache_manager is None:
         cache_manager = CacheManager()
     
-    # Tentar recuperar do cache
+    # Tentar recuperar da memória do processo e, depois, do cache em disco
     if not force_refresh:
+        if organization in _REPOS_MEMO:
+            yield from _REPOS_MEMO[organization]
+            return
+        
         cached_repos = cache_manager.get('repositories', organization)
         if cached_repos:
             print(f"📦 Usando repositórios em cache para {organization}")
-            return cached_repos.get('repositories', [])
+            _REPOS_MEMO[organization] = cached_repos.get('repositories', [])
+            yield from _REPOS_MEMO[organization]
+            return
     
     print(f"🔄 Buscando repositórios da organização {organization}...")
+    http = session or requests
     repos = []
     page = 1
     per_page = 100  # Máximo por página
+    complete = False
     
     headers = {'Accept': 'application/vnd.github.v3+json'}
     if token:
@@ -85,65 +136,151 @@ def get_github_repos(organization, token=None, cache_manager: Optional[CacheMana
             'type': 'all'  # Pega todos os tipos de repositórios
         }
         
+        page_key = f"{organization}:{page}"
+        cached_page = cache_manager.get('etags', page_key)
+        page_headers = dict(headers)
+        if cached_page and cached_page.get('etag'):
+            page_headers['If-None-Match'] = cached_page['etag']
+        
         print(f"📄 Buscando página {page}...")
-        response = requests.get(url, params=params, headers=headers)
+        response = http.get(url, params=params, headers=page_headers)
         
-        if response.status_code != 200:
+        if response.status_code == 304 and cached_page:
+            page_repos = cached_page.get('repositories', [])
+            has_next = cached_page.get('has_next', False)
+            print(f"📦 Página {page} inalterada (304): {len(page_repos)} repositórios")
+        elif response.status_code != 200:
             print(f"❌ Erro ao acessar a API do GitHub: {response.status_code}")
             print(f"📝 Resposta: {response.text}")
-            break
-        
-        page_repos = response.json()
-        print(f"✅ Página {page}: {len(page_repos)} repositórios encontrados")
+            # Interrompe em vez de entregar uma lista parcial como se fosse completa
+            raise RuntimeError(f"API do GitHub respondeu {response.status_code} na página {page}")
+        else:
+            page_repos = [{field: repo.get(field) for field in REPO_FIELDS}
+                          for repo in fast_json.response_json(response)]
+            has_next = 'next' in response.links
+            print(f"✅ Página {page}: {len(page_repos)} repositórios encontrados")
+            etag = response.headers.get('ETag')
+            if etag:
+                cache_manager.set('etags', {
+                    'etag': etag,
+                    'has_next': has_next,
+                    'repositories': page_repos
+                }, page_key)
         
         if not page_repos:
             print("📄 Fim das páginas")
+            complete = True
             break
             
         repos.extend(page_repos)
+        yield from page_repos
         page += 1
         
         # Verifica se há mais páginas
-        if 'next' not in response.links:
+        if not has_next:
             print("📄 Última página alcançada")
+            complete = True
             break
     
     print(f"📊 Total de repositórios coletados: {len(repos)}")
     
-    # Armazenar no cache
-    cache_data = {
-        'repositories': repos,
-        'cached_at': datetime.now().isoformat(),
-        'org': organization,
-        'count': len(repos)
-    }
-    cache_manager.set('repositories', cache_data, organization)
+    # Armazenar no cache apenas listas completas
+    if complete:
+        _REPOS_MEMO[organization] = repos
+        cache_data = {
+            'repositories': repos,
+            'cached_at': datetime.now().isoformat(),
+            'org': organization,
+            'count': len(repos)
+        }
+        cache_manager.set('repositories', cache_data, organization)
+
+def get_github_repos(organization, token=None, cache_manager: Optional[CacheManager] = None, 
+                    force_refresh: bool = False, session=None) -> List[Dict[str, Any]]:
+    """
+    Obtém todos os repositórios de uma organização do GitHub com cache inteligente
+    """
+    return list(iter_github_repos(organization, token, cache_manager, force_refresh, session))
+
+def get_github_repos_graphql(organization, token, include_archived: bool = False,
+                             session=None) -> Dict[str, Any]:
+    """
+    Obtém os repositórios via GraphQL, apenas com nome e situação (isArchived)
+
+    Sem include_archived, os arquivados são filtrados pela própria API.
+    Retorna {'repositories': [{'name', 'archived'}], 'archived_count': N}.
+    """
+    http = session or requests
+    query = REPOS_GRAPHQL_QUERY % ('' if include_archived else ', isArchived: false')
+    headers = {'Authorization': f'bearer {token}'}
     
-    return repos
+    print(f"🔄 Buscando repositórios da organização {organization} (GraphQL)...")
+    repos = []
+    archived_count = 0
+    cursor = None
+    while True:
+        response = fast_json.post_json(http, GRAPHQL_URL,
+                                       {'query': query, 'variables': {'org': organization, 'cursor': cursor}},
+                                       headers=headers)
+        response.raise_for_status()
+        payload = fast_json.response_json(response)
+        if payload.get('errors'):
+            raise RuntimeError(f"Erro na consulta GraphQL: {payload['errors']}")
+        
+        org_data = payload['data']['organization']
+        connection = org_data['repositories']
+        archived_count = org_data['archived']['totalCount']
+        repos.extend({'name': node['name'], 'archived': node['isArchived']}
+                     for node in connection['nodes'])
+        
+        if not connection['pageInfo']['hasNextPage']:
+            break
+        cursor = connection['pageInfo']['endCursor']
+    
+    print(f"📊 Total de repositórios coletados: {len(repos)}")
+    return {'repositories': repos, 'archived_count': archived_count}
 
 def export_to_csv(repos, filename):
     """
     Exporta os repositórios para um arquivo CSV
+
+    Aceita uma lista ou um iterador (ex: iter_github_repos); as linhas são
+    gravadas à medida que chegam em um arquivo temporário no mesmo diretório,
+    que só substitui `filename` depois que o iterador termina. Se a paginação
+    falhar no meio, o CSV anterior permanece intacto e a exceção é propagada.
+    Retorna o total de repositórios exportados.
     """
-    if not repos:
+    repos = iter(repos)
+    first = next(repos, None)
+    if first is None:
         print("Nenhum repositório encontrado.")
-        return
+        return 0
     
     # Define as colunas do CSV
     fieldnames = [
         'name', 'archived'
     ]
     
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for repo in repos:
-            row = {field: repo.get(field, '') for field in fieldnames}
-            writer.writerow(row)
+    count = 0
+    tmp_path = f"{filename}.tmp"
+    try:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            
+            for repo in itertools.chain((first,), repos):
+                row = {field: repo.get(field, '') for field in fieldnames}
+                writer.writerow(row)
+                count += 1
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
     
     print(f"Arquivo '{filename}' criado com sucesso!")
-    print(f"Total de repositórios exportados: {len(repos)}")
+    print(f"Total de repositórios exportados: {count}")
+    return count
 
 def get_organization_default_labels(organization, token):
     """
@@ -0,0 +1,172 @@
+"""Testes do CacheManager e do estado de processamento de issues (snapshot + journal)."""
+import os
+
+import pytest
+
+from scripts import cache_manager as cm
+from scripts.cache_manager import STATE_SHARDS, CacheManager, IssueProcessingState
+
+
+def _issue(issue_id, state='OPEN', updated_at='2025-01-01T00:00:00Z'):
+    return {
+        'id': issue_id,
+        'state': state,
+        'closedAt': None,
+        'updatedAt': updated_at,
+        'projectItems': {'nodes': [{'id': f'item-{issue_id}', 'fieldValues': {'nodes': []}}]},
+    }
+
+
+def _age(path, seconds):
+    """Recua o mtime do arquivo em `seconds` segundos."""
+    past = os.stat(path).st_mtime - seconds
+    os.utime(path, (past, past))
+
+
+@pytest.fixture
+def json_only(monkeypatch):
+    """Força o formato JSON mesmo com msgpack instalado."""
+    monkeypatch.setattr(cm, 'msgpack', None)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheManager(cache_dir=str(tmp_path))
+
+
+def test_json_round_trip(json_only, cache):
+    data = {'processed_issues': {'I_1': {'hash': 'abc', 'issue_data': _issue('I_1')}}}
+    cache.set('issue_processing_state', data, 'repo#0', quiet=True)
+
+    assert cache._get_cache_path('issue_processing_state', 'repo#0').suffix == '.json'
+    # Nova instância: lido do disco, sem a LRU em memória
+    fresh = CacheManager(cache_dir=str(cache.cache_dir))
+    assert fresh.get('issue_processing_state', 'repo#0', quiet=True) == data
+
+
+def test_msgpack_round_trip(cache):
+    pytest.importorskip('msgpack')
+    data = {'processed_issues': {'I_1': {'hash': 'abc', 'issue_data': _issue('I_1')}}}
+    cache.set('issue_processing_state', data, 'repo#0', quiet=True)
+
+    assert cache._get_cache_path('issue_processing_state', 'repo#0').suffix == '.msgpack'
+    fresh = CacheManager(cache_dir=str(cache.cache_dir))
+    assert fresh.get('issue_processing_state', 'repo#0', quiet=True) == data
+
+
+def test_get_returns_independent_copies(cache):
+    cache.set('issues', {'items': [1, 2]}, 'k', quiet=True)
+
+    first = cache.get('issues', 'k', quiet=True)
+    first['items'].append(3)
+    assert cache.get('issues', 'k', quiet=True) == {'items': [1, 2]}
+
+
+def test_expired_entry_is_not_returned(cache):
+    cache.set('issues', {'items': []}, 'k', quiet=True)
+    _age(cache._get_cache_path('issues', 'k'), 2 * 3600)
+
+    fresh = CacheManager(cache_dir=str(cache.cache_dir))
+    assert fresh.get('issues', 'k', quiet=True) is None
+
+
+def test_journal_is_replayed_by_a_new_instance(json_only, cache):
+    state = IssueProcessingState(cache)
+    state.mark_issues_processed('repo', [('I_1', _issue('I_1')), ('I_2', _issue('I_2'))])
+    state.flush()
+
+    # Sem compactação: só o journal está em disco
+    assert state._journal_path('repo').exists()
+    replayed = IssueProcessingState(CacheManager(cache_dir=str(cache.cache_dir)))
+    processed = replayed.get_processed_issues('repo')
+    assert set(processed) == {'I_1', 'I_2'}
+    assert not replayed.has_issue_changed('repo', 'I_1', _issue('I_1'))
+    assert replayed.has_issue_changed('repo', 'I_1', _issue('I_1', state='CLOSED'))
+    state.close()
+
+
+def test_truncated_journal_line_is_skipped(json_only, cache):
+    state = IssueProcessingState(cache)
+    state.mark_issues_processed('repo', [('I_1', _issue('I_1'))])
+    state.flush()
+    with open(state._journal_path('repo'), 'ab') as f:
+        f.write(b'{"issue_id": "I_2", "hash"')
+
+    replayed = IssueProcessingState(CacheManager(cache_dir=str(cache.cache_dir)))
+    assert set(replayed.get_processed_issues('repo')) == {'I_1'}
+    state.close()
+
+
+def test_close_compacts_journal_into_shards(json_only, cache):
+    with IssueProcessingState(cache) as state:
+        state.mark_issues_processed('repo', [(f'I_{n}', _issue(f'I_{n}')) for n in range(40)])
+        journal = state._journal_path('repo')
+
+    assert not journal.exists()
+    shard_files = [p for p in cache.cache_dir.iterdir() if p.name.startswith('issue_processing_state_')]
+    assert 0 < len(shard_files) <= STATE_SHARDS
+
+    reloaded = IssueProcessingState(CacheManager(cache_dir=str(cache.cache_dir)))
+    assert len(reloaded.get_processed_issues('repo')) == 40
+    assert not reloaded._dirty_shards['repo']
+
+
+def test_journal_is_compacted_when_it_doubles_the_state(json_only, cache):
+    state = IssueProcessingState(cache)
+    state.mark_issues_processed('repo', [('I_1', _issue('I_1'))])
+    state.mark_issues_processed('repo', [('I_1', _issue('I_1', updated_at='2025-01-02T00:00:00Z'))])
+    assert state._journal_lines['repo'] == 2
+
+    # Terceira linha para um único issue: passa de 2x e compacta
+    state.mark_issues_processed('repo', [('I_1', _issue('I_1', updated_at='2025-01-03T00:00:00Z'))])
+    assert state._journal_lines['repo'] == 0
+    assert not state._journal_path('repo').exists()
+    assert 'repo' not in state._state_fh
+
+    reloaded = IssueProcessingState(CacheManager(cache_dir=str(cache.cache_dir)))
+    stored = reloaded.get_processed_issues('repo')['I_1']
+    assert stored['issue_data']['updatedAt'] == '2025-01-03T00:00:00Z'
+
+
+def test_compaction_rewrites_only_dirty_shards(json_only, cache):
+    with IssueProcessingState(cache) as state:
+        state.mark_issues_processed('repo', [(f'I_{n}', _issue(f'I_{n}')) for n in range(40)])
+
+    state = IssueProcessingState(CacheManager(cache_dir=str(cache.cache_dir)))
+    state.mark_issues_processed('repo', [('I_0', _issue('I_0', state='CLOSED'))])
+    assert state._dirty_shards['repo'] == {cm._shard_of('I_0')}
+    state.close()
+
+    reloaded = IssueProcessingState(CacheManager(cache_dir=str(cache.cache_dir)))
+    processed = reloaded.get_processed_issues('repo')
+    assert len(processed) == 40
+    assert processed['I_0']['issue_data']['state'] == 'CLOSED'
+
+
+def test_expired_journal_is_deleted_and_not_replayed(json_only, cache):
+    state = IssueProcessingState(cache)
+    state.mark_issues_processed('repo', [('I_1', _issue('I_1'))])
+    state.flush()
+    journal = state._journal_path('repo')
+    state._state_fh.pop('repo').close()
+    _age(journal, 2 * 3600)
+
+    later = IssueProcessingState(CacheManager(cache_dir=str(cache.cache_dir)))
+    assert later.get_processed_issues('repo') == {}
+    assert not journal.exists()
+
+    # Uma nova marcação começa um journal limpo, sem as linhas vencidas
+    later.mark_issues_processed('repo', [('I_2', _issue('I_2'))])
+    later.flush()
+    assert b'I_1' not in journal.read_bytes()
+    later.close()
+
+
+def test_expired_shards_are_ignored(json_only, cache):
+    with IssueProcessingState(cache) as state:
+        state.mark_issues_processed('repo', [('I_1', _issue('I_1'))])
+    for path in cache.cache_dir.iterdir():
+        _age(path, 2 * 3600)
+
+    reloaded = IssueProcessingState(CacheManager(cache_dir=str(cache.cache_dir)))
+    assert reloaded.has_issue_changed('repo', 'I_1', _issue('I_1'))
@@ -0,0 +1,182 @@
+"""Testes das consultas e mutations em lote de issues_close_date."""
+import pytest
+
+from scripts import issues_close_date as icd
+
+
+def _project(project_id, status='Status', date='Data Fim'):
+    return {'id': project_id, 'number': 1, 'fields': [{'id': 'FS', 'name': status}, {'id': 'FD', 'name': date}]}
+
+
+@pytest.fixture
+def fake_pages(monkeypatch):
+    """_graphql falso: cada projeto tem pages[id] páginas com um issue e um draft cada."""
+    pages = {}
+    calls = []
+
+    def fake_graphql(token, query, variables):
+        calls.append(variables)
+        data = {}
+        n = 0
+        while f"p{n}" in variables:
+            project_id, page = variables[f"p{n}"], int(variables[f"c{n}"] or 0)
+            data[f"p{n}"] = {'items': {
+                'nodes': [
+                    {'id': f"{project_id}-{page}", 'content': {'id': f"I-{project_id}-{page}"},
+                     'status': {'name': 'Done'}, 'date': {}},
+                    {'id': f"draft-{project_id}-{page}", 'content': {}},
+                ],
+                'pageInfo': {'hasNextPage': page + 1 < pages[project_id], 'endCursor': str(page + 1)},
+            }}
+            n += 1
+        return data
+
+    monkeypatch.setattr(icd, '_graphql', fake_graphql)
+    return pages, calls
+
+
+def test_project_items_query_declares_variables_per_alias():
+    query = icd.project_items_query(2)
+
+    for n in range(2):
+        assert f"p{n}: node(id: $p{n})" in query
+        assert f"$c{n}: String" in query
+        assert f"fieldValueByName(name: $s{n})" in query
+    assert "p2:" not in query
+    assert icd.project_items_query(2) is query
+
+
+def test_fetch_projects_items_paginates_each_alias_independently(fake_pages):
+    pages, calls = fake_pages
+    pages.update({'A': 3, 'B': 1, 'C': 2})
+
+    results = icd.fetch_projects_items('tok', [_project('A'), _project('B'), _project('C')])
+
+    assert [[item['id'] for item in items] for items in results] == [
+        ['A-0', 'A-1', 'A-2'], ['B-0'], ['C-0', 'C-1'],
+    ]
+    # Uma requisição por rodada, só com os projetos que ainda têm páginas
+    assert [sorted(v[key] for key in v if key[0] == 'p') for v in calls] == [
+        ['A', 'B', 'C'], ['A', 'C'], ['A'],
+    ]
+    assert calls[1]['c0'] == '1'
+
+
+def test_fetch_projects_items_uses_each_projects_field_names(fake_pages):
+    pages, calls = fake_pages
+    pages.update({'A': 1, 'B': 1})
+
+    results = icd.fetch_projects_items(
+        'tok', [_project('A'), _project('B', status='STATUS', date='data fim')])
+
+    assert (calls[0]['s0'], calls[0]['d0']) == ('Status', 'Data Fim')
+    assert (calls[0]['s1'], calls[0]['d1']) == ('STATUS', 'data fim')
+    # Valores de campo no formato de fieldValues, com o nome do campo consultado;
+    # valores vazios (campo sem valor ou de outro tipo) são descartados
+    item = results[1][0]
+    assert 'status' not in item and 'date' not in item
+    assert item['fieldValues'] == {'nodes': [{'field': {'name': 'STATUS'}, 'name': 'Done'}]}
+
+
+def _op(kind, item_id, date=None, project_id='P1', field_id='F1'):
+    return icd.Op(kind, project_id, item_id, field_id, date, label=f"#{item_id}")
+
+
+def test_build_bulk_mutation_names_one_alias_per_op():
+    ops = [_op('set', 'I1', '2025-01-02'), _op('clear', 'I2'), _op('set', 'I3', '2025-01-02')]
+
+    query, variables = icd.build_bulk_mutation(ops)
+
+    for n in range(3):
+        assert f"m{n}: updateProjectV2ItemFieldValue(" in query
+        assert variables[f"i{n}"] == f"I{n + 1}"
+    assert "m3:" not in query
+    assert "{ date: null }" in query
+
+
+def test_build_bulk_mutation_shares_repeated_values():
+    ops = [_op('set', 'I1', '2025-01-02'), _op('set', 'I2', '2025-01-02', project_id='P2'),
+           _op('set', 'I3', '2025-03-04')]
+
+    query, variables = icd.build_bulk_mutation(ops)
+
+    assert {k: v for k, v in variables.items() if k[0] in 'pfv'} == {
+        'p0': 'P1', 'p1': 'P2', 'f0': 'F1', 'v0': '2025-01-02', 'v1': '2025-03-04',
+    }
+    assert query.count("$p0: ID!") == 1 and query.count("$f0: ID!") == 1
+    assert query.count("projectId: $p0") == 2
+
+
+def test_build_bulk_mutation_keeps_values_out_of_the_query_text():
+    nasty = 'I"1 } mutation { x'
+    query, variables = icd.build_bulk_mutation([_op('set', nasty, '2025-01-02"){')])
+
+    # IDs e datas vão só como variáveis: nenhuma aspa ou chave do valor chega ao documento
+    assert nasty not in query and '2025-01-02"' not in query
+    assert variables['i0'] == nasty
+    assert variables['v0'] == '2025-01-02"){'
+
+
+@pytest.fixture
+def fake_response(monkeypatch):
+    payloads = []
+
+    def respond(token, query, variables):
+        return payloads.pop(0)
+
+    monkeypatch.setattr(icd, '_graphql_response', respond)
+    return payloads
+
+
+def test_apply_batch_maps_errors_to_their_alias(fake_response):
+    fake_response.append({
+        'data': {'m0': {'clientMutationId': None}, 'm1': None, 'm2': None},
+        'errors': [
+            {'path': ['m1'], 'message': 'The item is archived and cannot be updated'},
+            {'path': ['m2'], 'message': 'Could not resolve to a node'},
+        ],
+    })
+
+    changes = icd._apply_batch('tok', [_op('set', 'I1', '2025-01-02'), _op('clear', 'I2'),
+                                       _op('clear', 'I3')], 'Data Fim')
+
+    assert changes == {'cleared': 0, 'set': 1, 'errors': 1, 'archived_skipped': 1}
+
+
+def test_apply_batch_without_data_fails_every_alias(fake_response):
+    fake_response.append({'data': None, 'errors': [{'message': 'Something went wrong'}]})
+
+    changes = icd._apply_batch('tok', [_op('set', 'I1', '2025-01-02'), _op('clear', 'I2')], 'Data Fim')
+
+    assert changes == {'cleared': 0, 'set': 0, 'errors': 2, 'archived_skipped': 0}
+
+
+def test_apply_batch_counts_a_failed_request_for_the_whole_batch(monkeypatch):
+    def fail(token, query, variables):
+        raise RuntimeError("GraphQL HTTP 502")
+
+    monkeypatch.setattr(icd, '_graphql_response', fail)
+
+    changes = icd._apply_batch('tok', [_op('clear', 'I1'), _op('clear', 'I2')], 'Data Fim')
+
+    assert changes['errors'] == 2
+
+
+def test_apply_changes_splits_batches_and_sums_results(monkeypatch):
+    batches = []
+
+    def respond(token, query, variables):
+        # Lotes seguem em paralelo: a resposta depende do lote, não da ordem
+        items = [v for k, v in sorted(variables.items()) if k[0] == 'i']
+        batches.append(items)
+        if items == ['I3']:
+            return {'data': {'m0': None}, 'errors': [{'path': ['m0'], 'message': 'boom'}]}
+        return {'data': {f"m{n}": {} for n in range(len(items))}}
+
+    monkeypatch.setattr(icd, '_graphql_response', respond)
+    ops = [_op('set', 'I1', '2025-01-02'), _op('clear', 'I2'), _op('clear', 'I3')]
+
+    changes = icd.apply_changes('tok', ops, batch_size=2)
+
+    assert sorted(batches) == [['I1', 'I2'], ['I3']]
+    assert changes == {'cleared': 1, 'set': 1, 'errors': 1, 'archived_skipped': 0}